@@ -1,13 +1,97 @@
-import json
-from typing import Optional
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
 
 import redis.asyncio as redis
 
-from .constants import CACHE_EXPIRY_SECONDS
-from .config import REDIS_URL
+from .constants import CACHE_EXPIRY_SECONDS, MAX_COMPILED_FILTERS
+from .config import (
+    REDIS_BREAKER_RESET_TIMEOUT,
+    REDIS_BREAKER_THRESHOLD,
+    REDIS_HEALTH_CHECK_INTERVAL,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_POOL_TIMEOUT,
+    REDIS_SOCKET_TIMEOUT,
+    REDIS_URL,
+)
+from .serialization import dumps, loads
+from .subscriptions.filters import Predicate, compile_filter
 
-# Initialize Redis client
-redis_client = redis.from_url(REDIS_URL)
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Skip calls to a dependency after repeated failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls are
+    skipped for `reset_timeout` seconds. Then a single probe call is let through:
+    its success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Return True if a call may be made now."""
+        state = self.state
+        if state == "half_open":
+            # Let this call probe and keep the others out for another reset period,
+            # which also covers a probe that never reports back
+            self.opened_at = time.monotonic()
+            return True
+        return state == "closed"
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info(f"{self.name} circuit closed")
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.opened_at is not None:
+            self.opened_at = time.monotonic()
+        elif self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            logger.warning(
+                f"{self.name} circuit opened after {self.failures} failures, "
+                f"skipping it for {self.reset_timeout}s"
+            )
+
+
+# Initialize Redis client with an explicitly sized pool; callers wait for a free
+# connection for up to `REDIS_POOL_TIMEOUT` seconds instead of failing at once
+redis_pool = redis.BlockingConnectionPool.from_url(
+    REDIS_URL,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    timeout=REDIS_POOL_TIMEOUT,
+    socket_timeout=REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+    health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+)
+redis_client = redis.Redis(connection_pool=redis_pool)
+redis_breaker = CircuitBreaker("Redis", REDIS_BREAKER_THRESHOLD, REDIS_BREAKER_RESET_TIMEOUT)
+
+# Compiled subscription filters kept in process, keyed by subscription ID
+compiled_filters: "OrderedDict[str, Tuple[list, Predicate]]" = OrderedDict()
+
+# Subscriptions whose cache invalidation has not reached Redis yet, replayed
+# before Redis is read again
+pending_invalidations: Set[str] = set()
 
 def cache_key_for_subscription(subscription_id: str) -> str:
     """
@@ -32,14 +116,58 @@ async def get_cached_subscription(subscription_id: str) -> Optional[dict]:
     Returns:
         Optional[dict]: The cached subscription data if found, otherwise None.
     """
+    if not redis_breaker.allow() or not await flush_pending_invalidations():
+        return None
     key = cache_key_for_subscription(subscription_id)
     try:
         data = await redis_client.get(key)
-        if data:
-            return json.loads(data)
+        redis_breaker.record_success()
+    except Exception as e:
+        redis_breaker.record_failure()
+        logger.warning(f"Redis get error: {e}")
+        return None
+    return _decode(subscription_id, data) if data else None
+
+
+async def get_cached_subscriptions(subscription_ids: List[str]) -> Dict[str, dict]:
+    """
+    Retrieve several cached subscription objects from Redis with a single MGET.
+
+    Args:
+        subscription_ids (List[str]): The unique IDs of the subscriptions.
+
+    Returns:
+        Dict[str, dict]: Cached subscription data keyed by ID. Misses and
+            unreadable entries are omitted.
+    """
+    if not subscription_ids or not redis_breaker.allow():
+        return {}
+    if not await flush_pending_invalidations():
+        return {}
+    keys = [cache_key_for_subscription(subscription_id) for subscription_id in subscription_ids]
+    try:
+        values = await redis_client.mget(keys)
+        redis_breaker.record_success()
+    except Exception as e:
+        redis_breaker.record_failure()
+        logger.warning(f"Redis mget error: {e}")
+        return {}
+
+    subscriptions = {}
+    for subscription_id, data in zip(subscription_ids, values):
+        subscription = _decode(subscription_id, data) if data else None
+        if subscription is not None:
+            subscriptions[subscription_id] = subscription
+    return subscriptions
+
+
+def _decode(subscription_id: str, data: bytes) -> Optional[dict]:
+    # An unreadable entry is a cache miss, not a Redis failure
+    try:
+        return loads(data)
     except Exception as e:
-        print(f"Redis get error: {e}")
-    return None
+        logger.warning(f"Ignoring unreadable cache entry for subscription {subscription_id}: {e}")
+        return None
 
 
 async def set_cached_subscription(
@@ -48,16 +176,57 @@ async def set_cached_subscription(
     """
     Store a subscription object in Redis with an expiry.
 
+    If the write is skipped or fails, the subscription's invalidation is kept
+    pending, so an entry cached before the write is never served.
+
     Args:
         subscription_id (str): The unique ID of the subscription.
         data (Optional[dict]): Subscription data to cache.
         expiry (int, optional): Expiry time in seconds. Defaults to `CACHE_EXPIRY_SECONDS`.
     """
+    if not redis_breaker.allow():
+        pending_invalidations.add(subscription_id)
+        return
     key = cache_key_for_subscription(subscription_id)
     try:
-        await redis_client.setex(key, expiry, json.dumps(data))
+        await redis_client.setex(key, expiry, dumps(data))
+        redis_breaker.record_success()
     except Exception as e:
-        print(f"Redis set error: {e}")
+        redis_breaker.record_failure()
+        pending_invalidations.add(subscription_id)
+        logger.warning(f"Redis set error: {e}")
+
+
+async def set_cached_subscriptions(
+    subscriptions: Dict[str, dict], expiry: int = CACHE_EXPIRY_SECONDS
+):
+    """
+    Store several subscription objects in Redis using a single pipeline.
+
+    As with `set_cached_subscription`, skipped or failed writes leave the
+    subscriptions' invalidations pending.
+
+    Args:
+        subscriptions (Dict[str, dict]): Subscription data keyed by subscription ID.
+        expiry (int, optional): Expiry time in seconds. Defaults to `CACHE_EXPIRY_SECONDS`.
+    """
+    if not subscriptions:
+        return
+    if not redis_breaker.allow():
+        pending_invalidations.update(subscriptions)
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for subscription_id, data in subscriptions.items():
+                pipe.setex(
+                    cache_key_for_subscription(subscription_id), expiry, dumps(data)
+                )
+            await pipe.execute()
+        redis_breaker.record_success()
+    except Exception as e:
+        redis_breaker.record_failure()
+        pending_invalidations.update(subscriptions)
+        logger.warning(f"Redis pipeline set error: {e}")
 
 
 async def invalidate_cached_subscription(subscription_id: str):
@@ -67,8 +236,88 @@ async def invalidate_cached_subscription(subscription_id: str):
     Args:
         subscription_id (str): The unique ID of the subscription.
     """
-    key = cache_key_for_subscription(subscription_id)
+    await invalidate_cached_subscriptions([subscription_id])
+
+
+async def invalidate_cached_subscriptions(subscription_ids: List[str]):
+    """
+    Invalidate (delete) several cached subscriptions from Redis in one call.
+
+    While Redis is unavailable the invalidations are kept in process and replayed
+    before the cache is read again, so no stale entry is served after an outage.
+
+    Args:
+        subscription_ids (List[str]): The unique IDs of the subscriptions.
+    """
+    if not subscription_ids:
+        return
+    pending_invalidations.update(subscription_ids)
+    if not redis_breaker.allow():
+        logger.warning(
+            f"Redis unavailable, deferring invalidation of {len(pending_invalidations)} cached subscriptions"
+        )
+        return
+    await flush_pending_invalidations()
+
+
+async def flush_pending_invalidations() -> bool:
+    """
+    Delete the cache entries of all pending invalidations in one call.
+
+    Returns:
+        bool: True if nothing is pending anymore, False if Redis failed and the
+            cache must not be read.
+    """
+    if not pending_invalidations:
+        return True
+    subscription_ids = list(pending_invalidations)
+    keys = [cache_key_for_subscription(subscription_id) for subscription_id in subscription_ids]
     try:
-        await redis_client.delete(key)
+        await redis_client.delete(*keys)
+        redis_breaker.record_success()
     except Exception as e:
-        print(f"Redis delete error: {e}")
+        redis_breaker.record_failure()
+        logger.warning(f"Redis delete error, {len(subscription_ids)} invalidations pending: {e}")
+        return False
+    # Invalidations added meanwhile stay pending for the next call
+    pending_invalidations.difference_update(subscription_ids)
+    return True
+
+
+def get_compiled_filter(subscription: dict) -> Optional[Predicate]:
+    """
+    Return the compiled predicate for a subscription's filters, compiling it only
+    when the filters are new or have changed.
+
+    Args:
+        subscription (dict): The subscription data, as cached or stored.
+
+    Returns:
+        Optional[Predicate]: The predicate, or None if the subscription has no filters.
+    """
+    conditions = subscription.get("filters")
+    if not conditions:
+        return None
+
+    subscription_id = str(subscription["_id"])
+    cached = compiled_filters.get(subscription_id)
+    if cached and cached[0] == conditions:
+        compiled_filters.move_to_end(subscription_id)
+        return cached[1]
+
+    predicate = compile_filter(conditions)
+    compiled_filters[subscription_id] = (conditions, predicate)
+    if len(compiled_filters) > MAX_COMPILED_FILTERS:
+        compiled_filters.popitem(last=False)
+    return predicate
+
+
+def invalidate_compiled_filters(subscription_ids: List[str]):
+    """
+    Drop compiled filters of subscriptions that were updated or deleted.
+
+    Args:
+        subscription_ids (List[str]): The unique IDs of the subscriptions.
+    """
+    for subscription_id in subscription_ids:
+        compiled_filters.pop(subscription_id, None)
@@ -0,0 +1,71 @@
+import gzip
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # zstd support is optional
+    zstandard = None
+
+IDENTITY = "identity"
+GZIP = "gzip"
+ZLIB = "zlib"
+ZSTD = "zstd"
+
+
+def is_supported(encoding: str) -> bool:
+    """
+    Check whether an encoding can be used in this environment.
+
+    Args:
+        encoding (str): The encoding name.
+
+    Returns:
+        bool: True if the encoding is available.
+    """
+    if encoding == ZSTD:
+        return zstandard is not None
+    return encoding in (IDENTITY, GZIP, ZLIB)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Compress bytes with the given encoding.
+
+    Args:
+        data (bytes): The raw bytes.
+        encoding (str): One of `identity`, `gzip`, `zlib` or `zstd`.
+
+    Returns:
+        bytes: The encoded bytes.
+    """
+    if encoding == IDENTITY:
+        return data
+    if encoding == GZIP:
+        return gzip.compress(data, mtime=0)  # fixed mtime keeps the output deterministic
+    if encoding == ZLIB:
+        return zlib.compress(data)
+    if encoding == ZSTD and zstandard is not None:
+        return zstandard.ZstdCompressor().compress(data)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    """
+    Decompress bytes produced by `compress`.
+
+    Args:
+        data (bytes): The encoded bytes.
+        encoding (str): The encoding used to produce them.
+
+    Returns:
+        bytes: The raw bytes.
+    """
+    if encoding == IDENTITY:
+        return data
+    if encoding == GZIP:
+        return gzip.decompress(data)
+    if encoding == ZLIB:
+        return zlib.decompress(data)
+    if encoding == ZSTD and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unsupported encoding: {encoding}")
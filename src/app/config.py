@@ -8,3 +8,33 @@ MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost")
 WORKER_COUNT = int(os.getenv("WORKER_COUNT", "10"))
 REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "10"))
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "1"))
+PAYLOAD_COMPRESSION = os.getenv("PAYLOAD_COMPRESSION", "zlib")
+PAYLOAD_COMPRESSION_MIN_SIZE = int(os.getenv("PAYLOAD_COMPRESSION_MIN_SIZE", "1024"))
+ADAPTIVE_TIMEOUT_FACTOR = float(os.getenv("ADAPTIVE_TIMEOUT_FACTOR", "3"))
+ADAPTIVE_TIMEOUT_MIN = float(os.getenv("ADAPTIVE_TIMEOUT_MIN", "1"))
+ADAPTIVE_TIMEOUT_MIN_SAMPLES = int(os.getenv("ADAPTIVE_TIMEOUT_MIN_SAMPLES", "20"))
+SHUTDOWN_DRAIN_TIMEOUT = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", "20"))
+SCHEDULER_POLL_INTERVAL = float(os.getenv("SCHEDULER_POLL_INTERVAL", "1"))
+SCHEDULER_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE", "500"))
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "1"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+REDIS_BREAKER_THRESHOLD = int(os.getenv("REDIS_BREAKER_THRESHOLD", "5"))
+REDIS_BREAKER_RESET_TIMEOUT = float(os.getenv("REDIS_BREAKER_RESET_TIMEOUT", "10"))
+PRIORITY_DEQUEUE = os.getenv("PRIORITY_DEQUEUE", "weighted")
+PRIORITY_WEIGHTS = os.getenv("PRIORITY_WEIGHTS", "high:8,normal:3,low:1")
+HIGH_PRIORITY_WORKERS = int(os.getenv("HIGH_PRIORITY_WORKERS", "2"))
+DNS_CACHE_TTL = float(os.getenv("DNS_CACHE_TTL", "60"))
+DNS_NEGATIVE_CACHE_TTL = float(os.getenv("DNS_NEGATIVE_CACHE_TTL", "10"))
+VALIDATE_TARGET_URLS = os.getenv("VALIDATE_TARGET_URLS", "false").lower() == "true"
+BLOCK_PRIVATE_TARGETS = os.getenv("BLOCK_PRIVATE_TARGETS", "false").lower() == "true"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+DIAGNOSTICS_ENABLED = os.getenv("DIAGNOSTICS_ENABLED", "false").lower() == "true"
+DIAGNOSTICS_TOKEN = os.getenv("DIAGNOSTICS_TOKEN")
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+SLOW_CALLBACK_THRESHOLD = float(os.getenv("SLOW_CALLBACK_THRESHOLD", "0.1"))
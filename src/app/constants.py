@@ -1,2 +1,14 @@
 RETRY_INTERVALS = [10, 30, 60, 300, 900]  # seconds
 CACHE_EXPIRY_SECONDS = 60 * 5  # 5 minutes
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000]  # histogram upper bounds
+STATS_MINUTE_RETENTION_SECONDS = 60 * 60 * 3  # 3 hours
+STATS_HOUR_RETENTION_SECONDS = 60 * 60 * 24 * 8  # 8 days
+MAX_BULK_SIZE = 1000  # subscriptions per bulk request
+OUTBOUND_COMPRESSION_MIN_SIZE = 1024  # bytes; smaller bodies are sent uncompressed
+MAX_COMPILED_FILTERS = 10000  # subscription filters kept compiled in memory
+PRIORITY_CLASSES = ["high", "normal", "low"]  # delivery queue lanes, most urgent first
+DEFAULT_PRIORITY = "normal"
+MAX_DNS_CACHE_ENTRIES = 10000  # resolved hosts kept in memory
+LOOP_LAG_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000]  # loop lag histogram upper bounds
+MAX_SLOW_CALLBACKS = 100  # most recent slow callbacks kept for inspection
+MAX_PROFILE_SECONDS = 60  # longest CPU profile or allocation capture
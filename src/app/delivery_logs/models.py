@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from typing import Dict, List
+
+from pymongo import UpdateOne
+
+from ..config import LOG_FLUSH_INTERVAL
+from ..database import db
+
+logger = logging.getLogger(__name__)
+collection = db.delivery_logs
+
+# Attempts and status changes waiting to be written, keyed by delivery ID
+pending_updates: Dict[str, dict] = {}
+
+
+async def ensure_delivery_log_indexes():
+    """
+    Create the indexes backing the delivery log listing queries.
+    """
+    await collection.create_index([("created_at", -1)])
+    await collection.create_index([("subscription_id", 1), ("created_at", -1)])
+
+
+async def create_delivery_log(log_entry: dict):
+    """
+    Insert a new delivery log so the delivery is visible before any attempt is made.
+
+    Args:
+        log_entry (dict): The delivery log document, including its `_id`.
+    """
+    await collection.insert_one(log_entry)
+    logger.debug(
+        "Created delivery log with ID %s.",
+        log_entry["_id"],
+        extra={
+            "event": "delivery_log.created",
+            "delivery_id": log_entry["_id"],
+            "subscription_id": log_entry.get("subscription_id"),
+        },
+    )
+
+
+async def mark_deliveries_pending(delivery_ids: List[str]):
+    """
+    Mark scheduled deliveries as pending once they have been queued.
+
+    Args:
+        delivery_ids (List[str]): The unique IDs of the delivery logs.
+    """
+    await collection.update_many(
+        {"_id": {"$in": delivery_ids}, "final_status": "scheduled"},
+        {"$set": {"final_status": "pending"}},
+    )
+
+
+def _pending_update_for(delivery_id: str) -> dict:
+    return pending_updates.setdefault(delivery_id, {"attempts": [], "set": {}})
+
+
+def record_attempt(delivery_id: str, attempt: dict):
+    """
+    Buffer a delivery attempt to be appended to its log on the next flush.
+
+    Args:
+        delivery_id (str): The unique ID of the delivery log.
+        attempt (dict): The attempt document to append.
+    """
+    _pending_update_for(delivery_id)["attempts"].append(attempt)
+
+
+def record_final_status(delivery_id: str, final_status: str):
+    """
+    Buffer the final status of a delivery to be written on the next flush.
+
+    Args:
+        delivery_id (str): The unique ID of the delivery log.
+        final_status (str): The final status (e.g. "success", "failed").
+    """
+    _pending_update_for(delivery_id)["set"]["final_status"] = final_status
+
+
+async def flush_pending_updates() -> int:
+    """
+    Write all buffered attempts and status changes in a single bulk write.
+
+    Returns:
+        int: Number of delivery logs updated.
+    """
+    if not pending_updates:
+        return 0
+
+    updates = dict(pending_updates)
+    pending_updates.clear()
+
+    operations = []
+    for delivery_id, update in updates.items():
+        change: dict = {}
+        if update["attempts"]:
+            change["$push"] = {"attempts": {"$each": update["attempts"]}}
+        if update["set"]:
+            change["$set"] = update["set"]
+        operations.append(UpdateOne({"_id": delivery_id}, change))
+
+    try:
+        await collection.bulk_write(operations, ordered=False)
+    except Exception as e:
+        logger.error(f"Error flushing delivery log updates: {e}")
+        # Put the updates back so they are retried on the next flush
+        for delivery_id, update in updates.items():
+            pending = _pending_update_for(delivery_id)
+            pending["attempts"][:0] = update["attempts"]
+            pending["set"] = {**update["set"], **pending["set"]}
+        return 0
+
+    return len(operations)
+
+
+async def flush_log_updates_periodically(stop_event: asyncio.Event):
+    """
+    Flush buffered delivery log updates every `LOG_FLUSH_INTERVAL` seconds until stopped.
+
+    Args:
+        stop_event (asyncio.Event): Event signalling shutdown.
+    """
+    while not stop_event.is_set():
+        await flush_pending_updates()
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=LOG_FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            continue
+
+    await flush_pending_updates()
+
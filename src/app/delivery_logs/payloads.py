@@ -0,0 +1,135 @@
+import json
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, Optional
+from datetime import datetime, timezone
+
+from pymongo.errors import DuplicateKeyError
+
+from ..compression import ZLIB, IDENTITY, compress, decompress, is_supported
+from ..config import PAYLOAD_COMPRESSION, PAYLOAD_COMPRESSION_MIN_SIZE
+from ..database import db
+from ..serialization import loads
+
+logger = logging.getLogger(__name__)
+collection = db.payloads
+
+if not is_supported(PAYLOAD_COMPRESSION):
+    logger.warning(
+        f"Payload compression '{PAYLOAD_COMPRESSION}' is not available, using '{ZLIB}'"
+    )
+    PAYLOAD_COMPRESSION = ZLIB
+
+
+def encode_payload(payload: Any) -> bytes:
+    """
+    Serialize a payload into the canonical bytes used for content addressing.
+
+    The encoding is fixed to the standard library's, whatever `JSON_BACKEND` is, so
+    the same payload always hashes to the same reference.
+
+    Args:
+        payload (Any): The JSON payload.
+
+    Returns:
+        bytes: Compact, ASCII-only JSON with sorted keys.
+    """
+    return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+
+
+async def store_payload(payload: Any, referenced_until: Optional[datetime] = None) -> str:
+    """
+    Store a payload once, keyed by the SHA-256 hash of its canonical bytes.
+
+    Payloads that are already stored are only touched so that retention
+    keeps them while delivery logs still reference them.
+
+    Args:
+        payload (Any): The JSON payload.
+        referenced_until (Optional[datetime], optional): Keep the payload at least as if
+            it were referenced at this time, e.g. the due time of a scheduled delivery.
+
+    Returns:
+        str: The payload reference (content hash).
+    """
+    body = encode_payload(payload)
+    payload_ref = hashlib.sha256(body).hexdigest()
+    referenced_at = datetime.now(timezone.utc)
+    if referenced_until and referenced_until > referenced_at:
+        referenced_at = referenced_until
+
+    encoding = (
+        PAYLOAD_COMPRESSION if len(body) >= PAYLOAD_COMPRESSION_MIN_SIZE else IDENTITY
+    )
+    update = {
+        "$max": {"last_referenced_at": referenced_at},
+        "$setOnInsert": {
+            "data": compress(body, encoding),
+            "encoding": encoding,
+            "size": len(body),
+        },
+    }
+    try:
+        await collection.update_one({"_id": payload_ref}, update, upsert=True)
+    except DuplicateKeyError:
+        # Inserted concurrently by another request; only touch it
+        await collection.update_one({"_id": payload_ref}, {"$max": update["$max"]})
+
+    return payload_ref
+
+
+async def load_payloads(payload_refs: Iterable[str]) -> Dict[str, Any]:
+    """
+    Load several payloads by reference in a single query.
+
+    Args:
+        payload_refs (Iterable[str]): Payload references to load.
+
+    Returns:
+        Dict[str, Any]: Decoded payloads keyed by reference. Missing references are omitted.
+    """
+    refs = list(set(payload_refs))
+    if not refs:
+        return {}
+
+    payloads = {}
+    async for doc in collection.find({"_id": {"$in": refs}}):
+        body = decompress(doc["data"], doc["encoding"])
+        payloads[doc["_id"]] = loads(body)
+    return payloads
+
+
+async def attach_payloads(logs: list) -> list:
+    """
+    Fill in the `payload` field of delivery logs that reference a stored payload.
+
+    Args:
+        logs (list): Delivery log documents.
+
+    Returns:
+        list: The same documents with payloads attached.
+    """
+    refs = [
+        log["payload_ref"] for log in logs if "payload_ref" in log and "payload" not in log
+    ]
+    payloads = await load_payloads(refs)
+    for log in logs:
+        if "payload" not in log and log.get("payload_ref") in payloads:
+            log["payload"] = payloads[log["payload_ref"]]
+    return logs
+
+
+async def delete_unreferenced_payloads(threshold_time: datetime) -> int:
+    """
+    Delete payloads not referenced by any delivery since `threshold_time`.
+
+    Args:
+        threshold_time (datetime): Payloads last referenced before this are removed.
+
+    Returns:
+        int: Number of payloads deleted.
+    """
+    result = await collection.delete_many(
+        {"last_referenced_at": {"$lt": threshold_time}}
+    )
+    return result.deleted_count
@@ -1,45 +1,158 @@
-from fastapi import APIRouter, Query, Path, HTTPException
-from typing import List
+from typing import List, Optional
+
+from fastapi import APIRouter, Query, Path, HTTPException, Response
 
 from pydantic import BaseModel, Field
 
+from ..delivery_logs.payloads import attach_payloads
 from ..delivery_logs.schemas import DeliveryLog, RecentDeliveryResponse
 from ..database import db
+from ..serialization import dumps
 
 router = APIRouter(tags=["Delivery Logs"])
 collection = db.delivery_logs
 
+# Fields selectable with `fields=`, mapped to their name in the document
+LOG_FIELDS = {
+    "delivery_id": "_id",
+    "subscription_id": "subscription_id",
+    "target_url": "target_url",
+    "event_types": "event_types",
+    "final_status": "final_status",
+    "created_at": "created_at",
+    "attempts": "attempts",
+    "payload_ref": "payload_ref",
+    "payload": "payload",
+}
+SUMMARY_FIELDS = ["delivery_id", "subscription_id", "final_status", "created_at"]
+
 
 class ErrorResponse(BaseModel):
     detail: str = Field(..., example="Delivery log not found")
 
 
+def payload_projection(include_payload: bool) -> Optional[dict]:
+    """
+    Build the projection for delivery log queries.
+
+    Args:
+        include_payload (bool): Whether the caller asked for payloads.
+
+    Returns:
+        Optional[dict]: Projection excluding inline payloads, or None to return everything.
+    """
+    return None if include_payload else {"payload": 0}
+
+
+def selected_fields(fields: Optional[str], summary: bool) -> Optional[List[str]]:
+    """
+    Resolve the `fields` and `summary` query params into a list of fields.
+
+    Args:
+        fields (Optional[str]): Comma-separated field names.
+        summary (bool): Whether to return only the summary fields.
+
+    Returns:
+        Optional[List[str]]: Selected fields, or None when full documents were requested.
+    """
+    if fields:
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in selected if field not in LOG_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=422, detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+        return selected
+    if summary:
+        return SUMMARY_FIELDS
+    return None
+
+
+def fields_projection(selected: List[str]) -> dict:
+    """
+    Build a projection returning only the selected fields.
+
+    Args:
+        selected (List[str]): Selected field names.
+
+    Returns:
+        dict: Mongo projection.
+    """
+    projection = {LOG_FIELDS[field]: 1 for field in selected}
+    if "payload" in selected:
+        projection["payload_ref"] = 1
+    return projection
+
+
+async def render_fields(logs: list, selected: List[str]) -> Response:
+    """
+    Serialize projected delivery logs straight to JSON bytes, without building models.
+
+    Args:
+        logs (list): Projected delivery log documents.
+        selected (List[str]): Selected field names.
+
+    Returns:
+        Response: JSON response with one object per log.
+    """
+    if "payload" in selected:
+        await attach_payloads(logs)
+
+    rows = [{field: log.get(LOG_FIELDS[field]) for field in selected} for log in logs]
+    return Response(content=dumps(rows), media_type="application/json")
+
+
 @router.get(
     "/delivery-logs",
     response_model=List[DeliveryLog],
     summary="Fetch delivery logs",
-    description="Retrieve a list of webhook delivery logs. Use `limit=-1` to fetch all logs.",
+    description=(
+        "Retrieve a list of webhook delivery logs. Use `limit=-1` to fetch all logs. "
+        "Use `fields=` or `summary=true` to return only some fields, which is much faster for large pages."
+    ),
     response_description="List of delivery log entries",
     responses={
         422: {"model": ErrorResponse, "description": "Validation error"},
     },
 )
 async def fetch_delivery_logs(
-    limit: int = Query(10, description="Number of logs to return. Use -1 to fetch all.")
+    limit: int = Query(10, description="Number of logs to return. Use -1 to fetch all."),
+    include_payload: bool = Query(False, description="Load the payload of each delivery"),
+    fields: Optional[str] = Query(
+        None, description=f"Comma-separated fields to return: {', '.join(LOG_FIELDS)}"
+    ),
+    summary: bool = Query(
+        False, description=f"Return only {', '.join(SUMMARY_FIELDS)}"
+    ),
 ) -> List[DeliveryLog]:
     """
     Fetch a list of delivery logs, sorted by most recent.
 
     Args:
         limit (int): Number of logs to return. -1 returns all logs.
+        include_payload (bool): Whether to load payloads from the payload store.
+        fields (Optional[str]): Comma-separated fields to return instead of full logs.
+        summary (bool): Whether to return only the summary fields.
 
     Returns:
         List[DeliveryLog]: List of delivery log entries.
     """
+    selected = selected_fields(fields, summary)
+    projection = (
+        fields_projection(selected) if selected else payload_projection(include_payload)
+    )
+
+    cursor = collection.find({}, projection).sort("created_at", -1)
     if limit == -1:
-        logs = await collection.find({}).sort("created_at", -1).to_list(length=None)
+        logs = await cursor.to_list(length=None)
     else:
-        logs = await collection.find({}).sort("created_at", -1).to_list(length=limit)
+        logs = await cursor.to_list(length=limit)
+
+    if selected:
+        return await render_fields(logs, selected)
+
+    if include_payload:
+        await attach_payloads(logs)
 
     return [DeliveryLog(**log) for log in logs]
 
@@ -56,20 +169,26 @@ async def fetch_delivery_logs(
     },
 )
 async def get_delivery_status(
-    delivery_id: str = Path(..., description="The unique delivery ID")
+    delivery_id: str = Path(..., description="The unique delivery ID"),
+    include_payload: bool = Query(False, description="Load the payload of the delivery"),
 ) -> DeliveryLog:
     """
     Get details of a specific delivery log by its ID.
 
     Args:
         delivery_id (str): The unique ID of the delivery log.
+        include_payload (bool): Whether to load the payload from the payload store.
 
     Returns:
         DeliveryLog: Delivery log object if found.
     """
-    log = await collection.find_one({"_id": delivery_id})
+    log = await collection.find_one(
+        {"_id": delivery_id}, payload_projection(include_payload)
+    )
     if not log:
         raise HTTPException(status_code=404, detail="Delivery log not found")
+    if include_payload:
+        await attach_payloads([log])
     return DeliveryLog(**log)
 
 
@@ -77,7 +196,10 @@ async def get_delivery_status(
     "/delivery/subscription/{sub_id}",
     response_model=List[RecentDeliveryResponse],
     summary="Get recent deliveries for a subscription",
-    description="Retrieve recent webhook deliveries for a given subscription ID, ordered by creation time.",
+    description=(
+        "Retrieve recent webhook deliveries for a given subscription ID, ordered by creation time. "
+        "Use `fields=` or `summary=true` to return only some fields."
+    ),
     response_description="List of recent deliveries",
     responses={
         422: {
@@ -89,6 +211,13 @@ async def get_delivery_status(
 async def get_recent_deliveries(
     sub_id: str = Path(..., description="The subscription ID"),
     limit: int = Query(20, description="Number of recent deliveries to return"),
+    include_payload: bool = Query(False, description="Load the payload of each delivery"),
+    fields: Optional[str] = Query(
+        None, description=f"Comma-separated fields to return: {', '.join(LOG_FIELDS)}"
+    ),
+    summary: bool = Query(
+        False, description=f"Return only {', '.join(SUMMARY_FIELDS)}"
+    ),
 ) -> List[RecentDeliveryResponse]:
     """
     Get recent webhook deliveries for a subscription.
@@ -96,20 +225,36 @@ async def get_recent_deliveries(
     Args:
         sub_id (str): Subscription ID to filter logs.
         limit (int): Maximum number of logs to return.
+        include_payload (bool): Whether to load payloads from the payload store.
+        fields (Optional[str]): Comma-separated fields to return instead of full summaries.
+        summary (bool): Whether to return only the summary fields.
 
     Returns:
         List[RecentDeliveryResponse]: List of recent delivery summaries.
     """
+    selected = selected_fields(fields, summary)
+    projection = (
+        fields_projection(selected) if selected else payload_projection(include_payload)
+    )
+
     cursor = (
-        collection.find({"subscription_id": sub_id}).sort("created_at", -1).limit(limit)
+        collection.find({"subscription_id": sub_id}, projection)
+        .sort("created_at", -1)
+        .limit(limit)
     )
     logs = await cursor.to_list(length=limit)
 
+    if selected:
+        return await render_fields(logs, selected)
+
+    if include_payload:
+        await attach_payloads(logs)
+
     return [
         RecentDeliveryResponse(
             delivery_id=log["_id"],
             event_types=log["event_types"],
-            payload=log["payload"],
+            payload=log.get("payload"),
             attempts=log["attempts"],
             status=log["final_status"],
             timestamp=log["created_at"].strftime("%Y-%m-%d %H:%M:%S"),
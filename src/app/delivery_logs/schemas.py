@@ -15,11 +15,13 @@ class DeliveryLog(BaseModel):
     attempts: List[Attempt]
     created_at: datetime = Field(default_factory=datetime.now(timezone.utc))
     delivery_id: str = Field(..., alias="_id")
+    deliver_at: Optional[datetime] = None  # Set for scheduled deliveries
     event_types: List[str]
     final_status: Optional[str] = (
         None  # Final status of the delivery (e.g., "success", "failed")
     )
-    payload: Any  # Payload can be any structure
+    payload: Any = None  # Payload can be any structure, only loaded on request
+    payload_ref: Optional[str] = None  # Content hash of the stored payload
     subscription_id: str
     target_url: str
 
@@ -27,7 +29,7 @@ class DeliveryLog(BaseModel):
 class RecentDeliveryResponse(BaseModel):
     delivery_id: str
     event_types: List[str]
-    payload: Dict[str, Any]
+    payload: Optional[Dict[str, Any]] = None
     attempts: List[Attempt]
     status: str
     timestamp: str
@@ -0,0 +1,124 @@
+import hmac
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+from ..config import DIAGNOSTICS_TOKEN
+from ..constants import MAX_PROFILE_SECONDS
+from ..diagnostics.schemas import AllocationReport, LoopStats
+from ..diagnostics.service import (
+    capture_allocations,
+    capture_lock,
+    capture_profile,
+    loop_monitor,
+)
+
+
+class ErrorResponse(BaseModel):
+    detail: str = Field(..., example="A capture is already running")
+
+
+async def require_token(
+    x_diagnostics_token: Optional[str] = Header(default=None, alias="X-Diagnostics-Token"),
+):
+    """Reject requests without the configured `DIAGNOSTICS_TOKEN`, and all requests if none is set."""
+    if not DIAGNOSTICS_TOKEN or not hmac.compare_digest(
+        x_diagnostics_token or "", DIAGNOSTICS_TOKEN
+    ):
+        raise HTTPException(status_code=401, detail="Invalid diagnostics token")
+
+
+router = APIRouter(tags=["Diagnostics"], dependencies=[Depends(require_token)])
+
+
+@router.get(
+    "/loop",
+    response_model=LoopStats,
+    summary="Get event loop lag",
+    description="Return the event loop lag histogram and the most recent callbacks that blocked the loop.",
+    response_description="Loop lag and slow callbacks",
+    responses={401: {"model": ErrorResponse, "description": "Invalid diagnostics token"}},
+)
+async def read_loop_stats() -> LoopStats:
+    """
+    Get the lag measured by the loop monitor since startup.
+
+    Returns:
+        LoopStats: Lag summary, histogram and slow callbacks.
+    """
+    return loop_monitor.snapshot()
+
+
+@router.post(
+    "/profile",
+    response_class=PlainTextResponse,
+    summary="Capture a CPU profile",
+    description=(
+        "Profile the event loop thread with cProfile for `seconds` and return the pstats report. "
+        "Profiling slows the service down while it runs."
+    ),
+    response_description="pstats report",
+    responses={
+        401: {"model": ErrorResponse, "description": "Invalid diagnostics token"},
+        409: {"model": ErrorResponse, "description": "A capture is already running"},
+    },
+)
+async def profile(
+    seconds: float = Query(5, gt=0, le=MAX_PROFILE_SECONDS, description="How long to profile"),
+    sort: Literal["cumulative", "tottime", "calls"] = Query(
+        "cumulative", description="Order of the report"
+    ),
+    limit: int = Query(50, ge=1, le=500, description="Number of functions to report"),
+) -> PlainTextResponse:
+    """
+    Capture a time-boxed CPU profile of the running process.
+
+    Args:
+        seconds (float): How long to profile.
+        sort (str): pstats sort key.
+        limit (int): Number of functions to report.
+
+    Returns:
+        PlainTextResponse: The pstats report.
+    """
+    if capture_lock.locked():
+        raise HTTPException(status_code=409, detail="A capture is already running")
+    async with capture_lock:
+        report = await capture_profile(seconds, sort, limit)
+    return PlainTextResponse(report)
+
+
+@router.post(
+    "/allocations",
+    response_model=AllocationReport,
+    summary="Capture an allocation snapshot",
+    description=(
+        "Trace allocations with tracemalloc for `seconds` and return the source lines whose memory grew most. "
+        "Tracing slows the service down while it runs."
+    ),
+    response_description="Allocation growth per source line",
+    responses={
+        401: {"model": ErrorResponse, "description": "Invalid diagnostics token"},
+        409: {"model": ErrorResponse, "description": "A capture is already running"},
+    },
+)
+async def allocations(
+    seconds: float = Query(5, gt=0, le=MAX_PROFILE_SECONDS, description="How long to trace"),
+    limit: int = Query(25, ge=1, le=500, description="Number of source lines to report"),
+) -> AllocationReport:
+    """
+    Capture a time-boxed allocation snapshot of the running process.
+
+    Args:
+        seconds (float): How long to trace.
+        limit (int): Number of source lines to report.
+
+    Returns:
+        AllocationReport: Traced memory totals and the top growing lines.
+    """
+    if capture_lock.locked():
+        raise HTTPException(status_code=409, detail="A capture is already running")
+    async with capture_lock:
+        return await capture_allocations(seconds, limit)
@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class SlowCallback(BaseModel):
+    callback: str  # coroutine or function that held the loop
+    duration_ms: float
+    at: datetime
+
+
+class LoopStats(BaseModel):
+    interval: float  # seconds between lag samples
+    samples: int
+    avg_lag_ms: Optional[float]
+    max_lag_ms: float
+    lag_histogram: Dict[str, int]  # sample count per lag bucket
+    slow_callback_threshold_ms: float
+    slow_callback_count: int
+    slow_callbacks: List[SlowCallback]  # most recent first
+
+
+class AllocationStat(BaseModel):
+    location: str  # file:line
+    size_kb: float
+    size_diff_kb: float  # growth during the capture
+    count: int
+    count_diff: int
+
+
+class AllocationReport(BaseModel):
+    seconds: float
+    traced_current_kb: float
+    traced_peak_kb: float
+    top: List[AllocationStat]
@@ -0,0 +1,232 @@
+import io
+import time
+import pstats
+import asyncio
+import cProfile
+import logging
+import tracemalloc
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, List, Optional
+
+from ..config import LOOP_LAG_INTERVAL, SLOW_CALLBACK_THRESHOLD
+from ..constants import LOOP_LAG_BUCKETS_MS, MAX_SLOW_CALLBACKS
+
+logger = logging.getLogger(__name__)
+
+# Only one profile or allocation capture runs at a time
+capture_lock = asyncio.Lock()
+
+
+def describe_callback(handle: asyncio.Handle) -> str:
+    """
+    Name the code behind an event loop callback, using the coroutine name for task steps.
+
+    Args:
+        handle (asyncio.Handle): The scheduled callback.
+
+    Returns:
+        str: Coroutine or function qualified name.
+    """
+    callback = getattr(handle, "_callback", None)
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        name = getattr(coro, "__qualname__", None) or repr(coro)
+        return f"{name} (task {owner.get_name()})"
+    return getattr(callback, "__qualname__", None) or repr(callback)
+
+
+class LoopMonitor:
+    """
+    Measure event loop lag and catch callbacks that block the loop.
+
+    A sampler task sleeps for `interval` seconds and records how late it wakes up
+    in a histogram. When `slow_callback_threshold` is set, every callback run by the
+    loop is timed and those taking longer are kept with their coroutine name.
+    """
+
+    def __init__(
+        self,
+        interval: float = LOOP_LAG_INTERVAL,
+        slow_callback_threshold: float = SLOW_CALLBACK_THRESHOLD,
+    ):
+        self.interval = interval
+        self.slow_callback_threshold = slow_callback_threshold
+        self.histogram = [0] * (len(LOOP_LAG_BUCKETS_MS) + 1)
+        self.samples = 0
+        self.lag_sum_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.slow_callbacks: Deque[dict] = deque(maxlen=MAX_SLOW_CALLBACKS)
+        self.slow_callback_count = 0
+        self._task: Optional[asyncio.Task] = None
+        self._original_run = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._sample())
+        if self.slow_callback_threshold > 0:
+            self._patch_handle()
+        logger.info(
+            f"Started loop monitor (interval {self.interval}s, "
+            f"slow callback threshold {self.slow_callback_threshold}s)"
+        )
+
+    async def stop(self):
+        if self._original_run is not None:
+            asyncio.Handle._run = self._original_run
+            self._original_run = None
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def record_lag(self, lag_ms: float):
+        self.samples += 1
+        self.lag_sum_ms += lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        for i, bound in enumerate(LOOP_LAG_BUCKETS_MS):
+            if lag_ms <= bound:
+                self.histogram[i] += 1
+                return
+        self.histogram[-1] += 1
+
+    async def _sample(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record_lag(max(time.perf_counter() - expected, 0) * 1000)
+
+    def _patch_handle(self):
+        monitor = self
+        original_run = asyncio.Handle._run
+        threshold = self.slow_callback_threshold
+
+        def timed_run(handle):
+            started = time.perf_counter()
+            original_run(handle)
+            duration = time.perf_counter() - started
+            if duration >= threshold:
+                monitor._record_slow_callback(handle, duration)
+
+        self._original_run = original_run
+        asyncio.Handle._run = timed_run
+
+    def _record_slow_callback(self, handle: asyncio.Handle, duration: float):
+        callback = describe_callback(handle)
+        self.slow_callback_count += 1
+        self.slow_callbacks.append(
+            {
+                "callback": callback,
+                "duration_ms": round(duration * 1000, 3),
+                "at": datetime.now(timezone.utc),
+            }
+        )
+        logger.warning(
+            "Event loop blocked for %.1f ms by %s",
+            duration * 1000,
+            callback,
+            extra={"event": "loop.slow_callback"},
+        )
+
+    def snapshot(self) -> dict:
+        """
+        Return the lag histogram and the most recent slow callbacks.
+
+        Returns:
+            dict: Lag summary, histogram per bucket and slow callbacks, newest first.
+        """
+        labels = [f"le_{bound}ms" for bound in LOOP_LAG_BUCKETS_MS] + ["le_inf"]
+        return {
+            "interval": self.interval,
+            "samples": self.samples,
+            "avg_lag_ms": self.lag_sum_ms / self.samples if self.samples else None,
+            "max_lag_ms": self.max_lag_ms,
+            "lag_histogram": dict(zip(labels, self.histogram)),
+            "slow_callback_threshold_ms": self.slow_callback_threshold * 1000,
+            "slow_callback_count": self.slow_callback_count,
+            "slow_callbacks": list(reversed(self.slow_callbacks)),
+        }
+
+
+loop_monitor = LoopMonitor()
+
+
+async def capture_profile(seconds: float, sort: str = "cumulative", limit: int = 50) -> str:
+    """
+    Profile the event loop thread with cProfile for a fixed time.
+
+    Everything the loop runs meanwhile is profiled: API handlers, workers and
+    periodic tasks.
+
+    Args:
+        seconds (float): How long to profile.
+        sort (str, optional): pstats sort key. Defaults to "cumulative".
+        limit (int, optional): Number of functions to report. Defaults to 50.
+
+    Returns:
+        str: The pstats report.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.disable()
+
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output)
+    stats.sort_stats(sort).print_stats(limit)
+    return output.getvalue()
+
+
+async def capture_allocations(seconds: float, limit: int = 25, frames: int = 1) -> dict:
+    """
+    Trace allocations with tracemalloc for a fixed time and report where memory grew.
+
+    Tracing is stopped afterwards unless it was already running.
+
+    Args:
+        seconds (float): How long to trace.
+        limit (int, optional): Number of source lines to report. Defaults to 25.
+        frames (int, optional): Stack frames kept per allocation. Defaults to 1.
+
+    Returns:
+        dict: Traced memory totals and the lines with the largest growth.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(frames)
+    try:
+        before = tracemalloc.take_snapshot()
+        await asyncio.sleep(seconds)
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    # Exclude tracemalloc's own bookkeeping
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    differences = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+
+    top: List[dict] = []
+    for difference in differences[:limit]:
+        frame = difference.traceback[0]
+        top.append(
+            {
+                "location": f"{frame.filename}:{frame.lineno}",
+                "size_kb": round(difference.size / 1024, 3),
+                "size_diff_kb": round(difference.size_diff / 1024, 3),
+                "count": difference.count,
+                "count_diff": difference.count_diff,
+            }
+        )
+
+    return {
+        "seconds": seconds,
+        "traced_current_kb": round(current / 1024, 3),
+        "traced_peak_kb": round(peak / 1024, 3),
+        "top": top,
+    }
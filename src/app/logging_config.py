@@ -0,0 +1,124 @@
+import queue
+import atexit
+import random
+import logging
+from typing import Dict, Optional
+from logging.handlers import QueueHandler, QueueListener
+
+from .config import LOG_FORMAT, LOG_LEVEL, LOG_SAMPLE_RATES
+from .serialization import dumps
+
+TEXT_FORMAT = "[%(asctime)s] %(levelname)s in %(name)s: %(message)s"
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+listener: Optional[QueueListener] = None
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """
+    Parse per-event sample rates such as "delivery.sent:0.1,ingest.received:0.01".
+
+    Args:
+        spec (str): Comma-separated `event:rate` pairs, rates between 0 and 1.
+
+    Returns:
+        Dict[str, float]: Share of records kept per event class.
+    """
+    rates = {}
+    for part in filter(None, (part.strip() for part in spec.split(","))):
+        event, _, rate = part.rpartition(":")
+        try:
+            rates[event] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a share of the records of each sampled event class.
+
+    The event class is the `event` passed in `extra`. Warnings and errors are never
+    dropped, nor are records without an event class.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(getattr(record, "event", None))
+        if rate is None or record.levelno >= logging.WARNING:
+            return True
+        return random.random() < rate
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener thread.
+
+    The stock `QueueHandler.prepare` formats the message in the calling thread, which
+    would put the formatting cost back on the event loop. Log arguments on the hot
+    path are immutable values, so the record can be handed over as is.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including fields passed in `extra`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and value is not None:
+                entry[key] = value if isinstance(value, (str, int, float, bool, list, dict)) else str(value)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return dumps(entry).decode()
+
+
+def setup_logging():
+    """
+    Route all logging through a queue drained by a background thread.
+
+    The event loop only enqueues records; formatting and writing happen in the
+    listener thread. `LOG_FORMAT=json` writes one JSON object per line.
+    """
+    global listener
+    if listener is not None:
+        return
+
+    handler = logging.StreamHandler()
+    if LOG_FORMAT == "json":
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(parse_sample_rates(LOG_SAMPLE_RATES)))
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Write out the queued records and stop the listener thread."""
+    global listener
+    if listener is not None:
+        listener.stop()
+        listener = None
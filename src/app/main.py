@@ -1,33 +1,48 @@
 import logging
-import asyncio
 
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 
+from .cache import redis_breaker
+from .config import DIAGNOSTICS_ENABLED, DIAGNOSTICS_TOKEN
+from .delivery_logs.models import ensure_delivery_log_indexes
 from .delivery_logs.router import router as logs_router
+from .diagnostics.service import loop_monitor
+from .logging_config import setup_logging
+from .stats.router import router as stats_router
+from .serialization import JSONResponse
+from .subscriptions.models import backfill_target_hosts, ensure_subscription_indexes
 from .subscriptions.router import router as subscriptions_router
 from .webhooks.router import router as webhooks_router
-from .workers.service import start_workers, stop_workers, wait_for_background_tasks
+from .workers.queue import PriorityDeliveryQueue
+from .workers.scheduler import ensure_scheduler_indexes
+from .workers.service import drain_workers, start_workers, wait_for_background_tasks
 
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+setup_logging()
+logger = logging.getLogger(__name__)
 
-# Stream handler (prints to console)
-handler = logging.StreamHandler()
-formatter = logging.Formatter("[%(asctime)s] %(levelname)s in %(name)s: %(message)s")
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+# Profiling endpoints can stall the service, so they are never exposed without a token
+diagnostics_enabled = DIAGNOSTICS_ENABLED and bool(DIAGNOSTICS_TOKEN)
+if DIAGNOSTICS_ENABLED and not DIAGNOSTICS_TOKEN:
+    logger.error("DIAGNOSTICS_ENABLED is set but DIAGNOSTICS_TOKEN is not, diagnostics stay disabled")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    app.state.queue = asyncio.Queue(maxsize=1000)  # optional: cap queue size
+    await ensure_delivery_log_indexes()
+    await ensure_subscription_indexes()
+    await backfill_target_hosts()
+    await ensure_scheduler_indexes()
+    app.state.queue = PriorityDeliveryQueue(maxsize=1000)  # optional: cap queue size
     start_workers(app.state.queue)
+    if diagnostics_enabled:
+        loop_monitor.start()
     print("API documentation is available at: http://localhost:8000/docs")
     yield
     logger.info("Shutting down...")
-    stop_workers(app.state.queue)
+    await drain_workers(app.state.queue)
     await wait_for_background_tasks()
+    await loop_monitor.stop()
 
 
 app = FastAPI(
@@ -35,6 +50,7 @@ app = FastAPI(
     description="A service for managing webhook subscriptions and delivering events.",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=JSONResponse,
 )
 
 app.include_router(
@@ -42,6 +58,13 @@ app.include_router(
 )
 app.include_router(webhooks_router, prefix="/ingest", tags=["Webhook Ingestion"])
 app.include_router(logs_router, prefix="/status", tags=["Delivery Logs"])
+app.include_router(stats_router, prefix="/stats", tags=["Delivery Stats"])
+
+# Profiling endpoints are only exposed when explicitly enabled
+if diagnostics_enabled:
+    from .diagnostics.router import router as diagnostics_router
+
+    app.include_router(diagnostics_router, prefix="/diagnostics", tags=["Diagnostics"])
 
 
 @app.get("/")
@@ -51,4 +74,4 @@ def read_root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok"}
+    return {"status": "ok", "redis": redis_breaker.state}
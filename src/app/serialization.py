@@ -0,0 +1,110 @@
+import re
+import json
+import logging
+from uuid import UUID
+from typing import Any, Union
+from datetime import date, datetime
+
+from starlette.responses import Response
+
+from .config import JSON_BACKEND
+
+try:
+    import orjson
+except ImportError:  # fast backends are optional
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+logger = logging.getLogger(__name__)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _select_backend(requested: str) -> str:
+    available = {"orjson": orjson is not None, "msgspec": msgspec is not None, "json": True}
+    if requested in available:
+        if available[requested]:
+            return requested
+        logger.warning(f"JSON backend '{requested}' is not installed, picking another one")
+    for backend in ("orjson", "msgspec", "json"):
+        if available[backend]:
+            return backend
+    return "json"
+
+
+BACKEND = _select_backend(JSON_BACKEND)
+
+# The fast backends only handle 64-bit integers: larger ones are parsed as floats
+# or rejected when encoding. Documents that may hold one go through the stdlib, so
+# numbers survive a round trip exactly. Any integer below -2**63 or above 2**64 - 1
+# has at least 19 digits, so a run of 19 digits is a cheap superset test.
+_LONG_NUMBER = re.compile(r"\d{19}")
+_LONG_NUMBER_BYTES = re.compile(rb"\d{19}")
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(
+        obj, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def _has_long_number(data: Union[bytes, str]) -> bool:
+    pattern = _LONG_NUMBER if isinstance(data, str) else _LONG_NUMBER_BYTES
+    return pattern.search(data) is not None
+
+
+# Every backend provides:
+#   dumps(obj) -> compact UTF-8 JSON bytes
+#   loads(data) -> parsed object, from bytes or str
+
+if BACKEND == "orjson":
+
+    def dumps(obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, default=_default)
+        except orjson.JSONEncodeError:
+            return _stdlib_dumps(obj)
+
+    def loads(data: Union[bytes, str]) -> Any:
+        if _has_long_number(data):
+            return json.loads(data)
+        return orjson.loads(data)
+
+elif BACKEND == "msgspec":
+    _encoder = msgspec.json.Encoder(enc_hook=_default)
+
+    def dumps(obj: Any) -> bytes:
+        try:
+            return _encoder.encode(obj)
+        except (OverflowError, msgspec.EncodeError):
+            return _stdlib_dumps(obj)
+
+    def loads(data: Union[bytes, str]) -> Any:
+        if _has_long_number(data):
+            return json.loads(data)
+        return msgspec.json.decode(data)
+
+else:
+    dumps = _stdlib_dumps
+    loads = json.loads
+
+
+class JSONResponse(Response):
+    """JSON response rendered with the configured fast backend."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,86 @@
+from typing import Literal
+
+from fastapi import APIRouter, Query, Path, HTTPException, Request
+from pydantic import BaseModel, Field
+
+from ..stats.schemas import QueueStats, SubscriptionStats
+from ..stats.service import get_subscription_stats
+from ..constants import STATS_HOUR_RETENTION_SECONDS, STATS_MINUTE_RETENTION_SECONDS
+
+router = APIRouter(tags=["Delivery Stats"])
+
+
+class ErrorResponse(BaseModel):
+    detail: str = Field(..., example="Stats are unavailable")
+
+
+@router.get(
+    "/subscription/{sub_id}",
+    response_model=SubscriptionStats,
+    summary="Get delivery stats for a subscription",
+    description=(
+        "Return success rate, attempt counts and latency percentiles for a subscription over the most recent "
+        "minute or hour buckets. Stats are pre-aggregated by the delivery workers and never read the delivery logs."
+    ),
+    response_description="Aggregated delivery stats",
+    responses={
+        422: {"model": ErrorResponse, "description": "Invalid query param"},
+        503: {"model": ErrorResponse, "description": "Stats are unavailable"},
+    },
+)
+async def read_subscription_stats(
+    sub_id: str = Path(..., description="The subscription ID"),
+    granularity: Literal["minute", "hour"] = Query(
+        "minute", description="Size of each bucket"
+    ),
+    buckets: int = Query(
+        60,
+        ge=1,
+        le=STATS_HOUR_RETENTION_SECONDS // 3600,
+        description="Number of buckets to return, including the current one",
+    ),
+) -> SubscriptionStats:
+    """
+    Get pre-aggregated delivery stats for a subscription.
+
+    Args:
+        sub_id (str): Subscription ID to report on.
+        granularity (str): Either "minute" or "hour".
+        buckets (int): Number of buckets to return.
+
+    Returns:
+        SubscriptionStats: Totals over the window and the per-bucket breakdown.
+    """
+    if granularity == "minute" and buckets > STATS_MINUTE_RETENTION_SECONDS // 60:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {STATS_MINUTE_RETENTION_SECONDS // 60} minute buckets are kept",
+        )
+
+    try:
+        return await get_subscription_stats(sub_id, granularity, buckets)
+    except Exception:
+        raise HTTPException(status_code=503, detail="Stats are unavailable")
+
+
+@router.get(
+    "/queue",
+    response_model=QueueStats,
+    summary="Get delivery queue stats",
+    description=(
+        "Return the depth, throughput and queue wait percentiles of each priority lane of this instance's "
+        "delivery queue. Wait percentiles follow recent traffic."
+    ),
+    response_description="Per-lane queue stats",
+)
+async def read_queue_stats(request: Request) -> QueueStats:
+    """
+    Get per-priority metrics of the in-process delivery queue.
+
+    Args:
+        request (Request): Incoming HTTP request object, used to reach the queue.
+
+    Returns:
+        QueueStats: Dequeue mode, lane weights and metrics per lane.
+    """
+    return request.app.state.queue.snapshot()
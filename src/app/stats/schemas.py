@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
+
+from pydantic import BaseModel
+
+
+class StatsBucket(BaseModel):
+    attempts: int
+    successful_attempts: int
+    failed_attempts: int
+    deliveries_succeeded: int
+    deliveries_failed: int
+    success_rate: Optional[float]  # Share of finished deliveries that succeeded
+    avg_latency_ms: Optional[float]
+    p50_latency_ms: Optional[float]
+    p95_latency_ms: Optional[float]
+    p99_latency_ms: Optional[float]
+    latency_histogram: Dict[str, int]  # Attempt count per latency bucket
+
+
+class TimedStatsBucket(StatsBucket):
+    start: datetime
+
+
+class SubscriptionStats(BaseModel):
+    subscription_id: str
+    granularity: Literal["minute", "hour"]
+    start: datetime
+    end: datetime
+    totals: StatsBucket
+    buckets: List[TimedStatsBucket]
+
+
+class QueueLaneStats(BaseModel):
+    depth: int  # events currently waiting in the lane
+    enqueued: int
+    dequeued: int
+    wait_p50_ms: Optional[float]  # time spent in the queue before a worker took the event
+    wait_p95_ms: Optional[float]
+    wait_p99_ms: Optional[float]
+
+
+class QueueStats(BaseModel):
+    mode: Literal["strict", "weighted"]
+    weights: Dict[str, int]
+    size: int
+    maxsize: int
+    lanes: Dict[str, QueueLaneStats]
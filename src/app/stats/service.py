@@ -0,0 +1,271 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+from datetime import datetime, timezone
+
+from ..cache import redis_breaker, redis_client
+from ..config import LOG_FLUSH_INTERVAL
+from ..constants import (
+    LATENCY_BUCKETS_MS,
+    STATS_HOUR_RETENTION_SECONDS,
+    STATS_MINUTE_RETENTION_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+GRANULARITY_SECONDS = {"minute": 60, "hour": 3600}
+RETENTION_SECONDS = {
+    "minute": STATS_MINUTE_RETENTION_SECONDS,
+    "hour": STATS_HOUR_RETENTION_SECONDS,
+}
+HISTOGRAM_FIELDS = [f"latency_le_{bound}" for bound in LATENCY_BUCKETS_MS] + [
+    "latency_le_inf"
+]
+
+# Counter increments waiting to be flushed, keyed by Redis hash key
+pending_counters: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+
+def stats_key(subscription_id: str, granularity: str, bucket_start: int) -> str:
+    """
+    Generate the Redis key holding the counters of one time bucket.
+
+    Args:
+        subscription_id (str): The unique ID of the subscription.
+        granularity (str): Either "minute" or "hour".
+        bucket_start (int): Bucket start as a Unix timestamp.
+
+    Returns:
+        str: Namespaced Redis key.
+    """
+    return f"stats:{subscription_id}:{granularity}:{bucket_start}"
+
+
+def bucket_start_for(timestamp: float, granularity: str) -> int:
+    """
+    Align a Unix timestamp to the start of its bucket.
+
+    Args:
+        timestamp (float): Unix timestamp.
+        granularity (str): Either "minute" or "hour".
+
+    Returns:
+        int: Bucket start as a Unix timestamp.
+    """
+    size = GRANULARITY_SECONDS[granularity]
+    return int(timestamp // size) * size
+
+
+def histogram_field(latency_ms: float) -> str:
+    """
+    Return the histogram field a latency falls into.
+
+    Args:
+        latency_ms (float): Latency in milliseconds.
+
+    Returns:
+        str: Name of the histogram field.
+    """
+    for bound, field in zip(LATENCY_BUCKETS_MS, HISTOGRAM_FIELDS):
+        if latency_ms <= bound:
+            return field
+    return HISTOGRAM_FIELDS[-1]
+
+
+def _increment(subscription_id: str, counters: Dict[str, int]):
+    now = datetime.now(timezone.utc).timestamp()
+    for granularity in GRANULARITY_SECONDS:
+        key = stats_key(subscription_id, granularity, bucket_start_for(now, granularity))
+        for field, amount in counters.items():
+            pending_counters[key][field] += amount
+
+
+def record_attempt_stats(subscription_id: str, success: bool, latency_ms: float):
+    """
+    Count a delivery attempt and its latency in the current buckets.
+
+    Args:
+        subscription_id (str): The unique ID of the subscription.
+        success (bool): Whether the attempt succeeded.
+        latency_ms (float): Time taken by the HTTP attempt in milliseconds.
+    """
+    _increment(
+        subscription_id,
+        {
+            "attempts": 1,
+            "successful_attempts" if success else "failed_attempts": 1,
+            "latency_count": 1,
+            "latency_sum_ms": round(latency_ms),
+            histogram_field(latency_ms): 1,
+        },
+    )
+
+
+def record_delivery_stats(subscription_id: str, final_status: str):
+    """
+    Count a finished delivery in the current buckets.
+
+    Args:
+        subscription_id (str): The unique ID of the subscription.
+        final_status (str): The final status of the delivery.
+    """
+    field = "deliveries_succeeded" if final_status == "success" else "deliveries_failed"
+    _increment(subscription_id, {field: 1})
+
+
+async def flush_pending_stats() -> int:
+    """
+    Apply all buffered counter increments in a single Redis pipeline.
+
+    Returns:
+        int: Number of bucket hashes updated.
+    """
+    if not pending_counters:
+        return 0
+
+    counters = dict(pending_counters)
+    pending_counters.clear()
+
+    # Stats are best effort, so increments are dropped rather than piling up
+    if not redis_breaker.allow():
+        logger.warning(f"Redis unavailable, dropped stats for {len(counters)} buckets")
+        return 0
+
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key, fields in counters.items():
+                for field, amount in fields.items():
+                    pipe.hincrby(key, field, amount)
+                granularity = key.split(":")[2]
+                pipe.expire(key, RETENTION_SECONDS[granularity])
+            await pipe.execute()
+        redis_breaker.record_success()
+    except Exception as e:
+        redis_breaker.record_failure()
+        logger.error(f"Error flushing delivery stats: {e}")
+        return 0
+
+    return len(counters)
+
+
+async def flush_stats_periodically(stop_event: asyncio.Event):
+    """
+    Flush buffered stats every `LOG_FLUSH_INTERVAL` seconds until stopped.
+
+    Args:
+        stop_event (asyncio.Event): Event signalling shutdown.
+    """
+    while not stop_event.is_set():
+        await flush_pending_stats()
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=LOG_FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            continue
+
+    await flush_pending_stats()
+
+
+def _percentile(histogram: Dict[str, int], total: int, quantile: float) -> Optional[float]:
+    if not total:
+        return None
+    rank = quantile * total
+    seen = 0
+    for bound, field in zip(LATENCY_BUCKETS_MS, HISTOGRAM_FIELDS):
+        seen += histogram.get(field, 0)
+        if seen >= rank:
+            return float(bound)
+    return float(LATENCY_BUCKETS_MS[-1])
+
+
+def summarize_bucket(counters: Dict[str, int]) -> dict:
+    """
+    Derive rates and latency percentiles from raw bucket counters.
+
+    Percentiles are reported as the upper bound of the histogram bucket they fall into.
+
+    Args:
+        counters (Dict[str, int]): Raw counters of one or more buckets.
+
+    Returns:
+        dict: Counters plus success rate and latency summary.
+    """
+    finished = counters.get("deliveries_succeeded", 0) + counters.get(
+        "deliveries_failed", 0
+    )
+    latency_count = counters.get("latency_count", 0)
+    histogram = {field: counters.get(field, 0) for field in HISTOGRAM_FIELDS}
+    return {
+        "attempts": counters.get("attempts", 0),
+        "successful_attempts": counters.get("successful_attempts", 0),
+        "failed_attempts": counters.get("failed_attempts", 0),
+        "deliveries_succeeded": counters.get("deliveries_succeeded", 0),
+        "deliveries_failed": counters.get("deliveries_failed", 0),
+        "success_rate": (
+            counters.get("deliveries_succeeded", 0) / finished if finished else None
+        ),
+        "avg_latency_ms": (
+            counters.get("latency_sum_ms", 0) / latency_count if latency_count else None
+        ),
+        "p50_latency_ms": _percentile(histogram, latency_count, 0.50),
+        "p95_latency_ms": _percentile(histogram, latency_count, 0.95),
+        "p99_latency_ms": _percentile(histogram, latency_count, 0.99),
+        "latency_histogram": histogram,
+    }
+
+
+async def get_subscription_stats(
+    subscription_id: str, granularity: str, buckets: int
+) -> dict:
+    """
+    Read the most recent stats buckets of a subscription from Redis.
+
+    Args:
+        subscription_id (str): The unique ID of the subscription.
+        granularity (str): Either "minute" or "hour".
+        buckets (int): Number of buckets to return, including the current one.
+
+    Returns:
+        dict: Totals over the window and the per-bucket breakdown.
+
+    Raises:
+        ConnectionError: If Redis is known to be down.
+    """
+    if not redis_breaker.allow():
+        raise ConnectionError("Redis circuit is open")
+
+    size = GRANULARITY_SECONDS[granularity]
+    current = bucket_start_for(datetime.now(timezone.utc).timestamp(), granularity)
+    starts: List[int] = [current - size * i for i in reversed(range(buckets))]
+
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for start in starts:
+                pipe.hgetall(stats_key(subscription_id, granularity, start))
+            results = await pipe.execute()
+    except Exception:
+        redis_breaker.record_failure()
+        raise
+    redis_breaker.record_success()
+
+    totals: Dict[str, int] = defaultdict(int)
+    series = []
+    for start, raw in zip(starts, results):
+        counters = {field.decode(): int(value) for field, value in raw.items()}
+        for field, value in counters.items():
+            totals[field] += value
+        series.append(
+            {
+                "start": datetime.fromtimestamp(start, timezone.utc),
+                **summarize_bucket(counters),
+            }
+        )
+
+    return {
+        "subscription_id": subscription_id,
+        "granularity": granularity,
+        "start": datetime.fromtimestamp(starts[0], timezone.utc),
+        "end": datetime.fromtimestamp(current + size, timezone.utc),
+        "totals": summarize_bucket(totals),
+        "buckets": series,
+    }
@@ -0,0 +1,126 @@
+import operator
+from typing import Any, Callable, List
+
+Predicate = Callable[[Any], bool]
+
+_MISSING = object()
+
+COMPARISONS = {
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+
+def _compile_path(path: str) -> Callable[[Any], Any]:
+    parts = [int(part) if part.isdigit() else part for part in path.split(".")]
+
+    def resolve(payload: Any) -> Any:
+        value = payload
+        for part in parts:
+            if isinstance(value, dict):
+                value = value.get(part if not isinstance(part, int) else str(part), _MISSING)
+            elif isinstance(value, list) and isinstance(part, int):
+                value = value[part] if part < len(value) else _MISSING
+            else:
+                return _MISSING
+            if value is _MISSING:
+                return _MISSING
+        return value
+
+    return resolve
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _json_equal(left: Any, right: Any) -> bool:
+    # JSON equality: unlike Python, `true` never equals 1 nor `false` 0, at any depth
+    if isinstance(left, bool) or isinstance(right, bool):
+        return type(left) is type(right) and left == right
+    if isinstance(left, list) and isinstance(right, list):
+        return len(left) == len(right) and all(map(_json_equal, left, right))
+    if isinstance(left, dict) and isinstance(right, dict):
+        return left.keys() == right.keys() and all(
+            _json_equal(value, right[key]) for key, value in left.items()
+        )
+    return left == right
+
+
+def _member_key(value: Any) -> Any:
+    # Hash booleans apart from the numbers they compare equal to
+    return (bool, value) if isinstance(value, bool) else value
+
+
+def compile_condition(condition: dict) -> Predicate:
+    """
+    Compile a single filter condition into a predicate over a payload.
+
+    Args:
+        condition (dict): A condition with `path`, `op` and `value`.
+
+    Returns:
+        Predicate: Function returning True when the payload matches.
+    """
+    resolve = _compile_path(condition["path"])
+    op = condition["op"]
+    expected = condition.get("value")
+
+    if op == "exists":
+        should_exist = expected is not False
+        return lambda payload: (resolve(payload) is not _MISSING) == should_exist
+
+    if op == "eq":
+        return lambda payload: _json_equal(resolve(payload), expected)
+
+    if op == "ne":
+        return lambda payload: not _json_equal(resolve(payload), expected)
+
+    if op in ("in", "nin"):
+        try:
+            options = frozenset(_member_key(option) for option in expected)
+        except TypeError:  # unhashable options such as objects
+            options = list(expected)
+        if op == "in":
+            return lambda payload: _is_member(resolve(payload), options)
+        return lambda payload: not _is_member(resolve(payload), options)
+
+    if op in COMPARISONS:
+        compare = COMPARISONS[op]
+
+        def predicate(payload: Any) -> bool:
+            value = resolve(payload)
+            return _is_number(value) and compare(value, expected)
+
+        return predicate
+
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+
+def _is_member(value: Any, options) -> bool:
+    if value is _MISSING:
+        return False
+    if isinstance(options, list):
+        return any(_json_equal(value, option) for option in options)
+    try:
+        return _member_key(value) in options
+    except TypeError:  # unhashable value checked against a frozenset
+        return False
+
+
+def compile_filter(conditions: List[dict]) -> Predicate:
+    """
+    Compile a subscription filter into a single predicate. All conditions must match.
+
+    Args:
+        conditions (List[dict]): The subscription's filter conditions.
+
+    Returns:
+        Predicate: Function returning True when the payload matches every condition.
+    """
+    predicates = [compile_condition(condition) for condition in conditions]
+    if len(predicates) == 1:
+        return predicates[0]
+    return lambda payload: all(predicate(payload) for predicate in predicates)
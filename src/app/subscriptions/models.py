@@ -1,10 +1,16 @@
 import logging
-from typing import Optional, List
+from typing import Dict, Optional, List
+from urllib.parse import urlparse
+
+from pymongo import InsertOne, UpdateOne
 
 from ..cache import (
     get_cached_subscription,
     set_cached_subscription,
+    set_cached_subscriptions,
     invalidate_cached_subscription,
+    invalidate_cached_subscriptions,
+    invalidate_compiled_filters,
 )
 from ..database import db  # motor client
 
@@ -12,6 +18,63 @@ from ..database import db  # motor client
 logger = logging.getLogger(__name__)
 collection = db.subscriptions
 
+TARGET_HOST_BACKFILL_BATCH_SIZE = 1000
+
+
+async def ensure_subscription_indexes():
+    """
+    Create the indexes backing the filtered, cursor-paginated subscription listing.
+    """
+    await collection.create_index([("event_types", 1), ("_id", 1)])
+    await collection.create_index([("target_host", 1), ("_id", 1)])
+
+
+async def backfill_target_hosts() -> int:
+    """
+    Set `target_host` on subscriptions created before it existed, so that
+    filtering listings by host includes them.
+
+    Returns:
+        int: Number of subscriptions updated.
+    """
+    updated = 0
+    operations = []
+    cursor = collection.find(
+        {"target_host": {"$exists": False}, "target_url": {"$exists": True}},
+        {"target_url": 1},
+    )
+    async for subscription in cursor:
+        operations.append(
+            UpdateOne(
+                {"_id": subscription["_id"]},
+                {"$set": {"target_host": urlparse(subscription["target_url"]).hostname}},
+            )
+        )
+        if len(operations) >= TARGET_HOST_BACKFILL_BATCH_SIZE:
+            updated += (await collection.bulk_write(operations, ordered=False)).modified_count
+            operations = []
+    if operations:
+        updated += (await collection.bulk_write(operations, ordered=False)).modified_count
+
+    if updated:
+        logger.info(f"Backfilled target_host on {updated} subscriptions.")
+    return updated
+
+
+def with_target_host(data: dict) -> dict:
+    """
+    Add the `target_host` field derived from `target_url`, used to filter listings.
+
+    Args:
+        data (dict): Subscription data, possibly containing `target_url`.
+
+    Returns:
+        dict: The same data with `target_host` set when `target_url` is present.
+    """
+    if data.get("target_url"):
+        data["target_host"] = urlparse(data["target_url"]).hostname
+    return data
+
 
 async def create_subscription(data: dict):
     """
@@ -20,8 +83,9 @@ async def create_subscription(data: dict):
     Args:
         data (dict): The subscription data to insert.
     """
+    with_target_host(data)
+    # Cache only once stored, so a failed insert never becomes visible to ingest
     await collection.insert_one(data)
-    # Cache the new subscription
     await set_cached_subscription(str(data["_id"]), data)
     logger.info(f"Created and cached subscription with ID {data['_id']}.")
 
@@ -36,6 +100,7 @@ async def delete_subscription(sub_id: str):
     await collection.delete_one({"_id": sub_id})
     # Invalidate the cache
     await invalidate_cached_subscription(sub_id)
+    invalidate_compiled_filters([sub_id])
     logger.info(f"Deleted subscription with ID {sub_id} and invalidated cache.")
 
 
@@ -55,7 +120,11 @@ async def get_subscription(
     # Try fetching from the cache first
     cached_data = await get_cached_subscription(sub_id)
     if cached_data:
-        logger.info(f"Cache hit for subscription ID {sub_id}.")
+        logger.debug(
+            "Cache hit for subscription ID %s.",
+            sub_id,
+            extra={"event": "subscription.cache_hit", "subscription_id": sub_id},
+        )
         return cached_data
 
     # If not in cache, fetch from the database
@@ -69,21 +138,42 @@ async def get_subscription(
     if subscription:
         await set_cached_subscription(sub_id, subscription)
         logger.info(
-            f"Cache miss for subscription ID {sub_id}, fetched from DB and cached."
+            "Cache miss for subscription ID %s, fetched from DB and cached.",
+            sub_id,
+            extra={"event": "subscription.cache_miss", "subscription_id": sub_id},
         )
 
     return subscription
 
 
-async def list_subscriptions() -> list:
+async def list_subscriptions(
+    limit: int = 100,
+    after: Optional[str] = None,
+    event_type: Optional[str] = None,
+    target_host: Optional[str] = None,
+) -> list:
     """
-    List all subscriptions from the database.
+    List subscriptions ordered by ID, one page at a time.
+
+    Args:
+        limit (int, optional): Maximum number of subscriptions to return. Defaults to 100.
+        after (Optional[str], optional): Return subscriptions with an ID after this one (the cursor).
+        event_type (Optional[str], optional): Only return subscriptions for this event type.
+        target_host (Optional[str], optional): Only return subscriptions delivering to this host.
 
     Returns:
-        list: A list of all subscriptions.
+        list: A page of subscriptions.
     """
-    cursor = collection.find({})
-    return await cursor.to_list(length=100)
+    query: dict = {}
+    if after:
+        query["_id"] = {"$gt": after}
+    if event_type:
+        query["event_types"] = event_type
+    if target_host:
+        query["target_host"] = target_host.lower()
+
+    cursor = collection.find(query).sort("_id", 1).limit(limit)
+    return await cursor.to_list(length=limit)
 
 
 async def update_subscription(sub_id: str, data: dict):
@@ -102,6 +192,7 @@ async def update_subscription(sub_id: str, data: dict):
         return None
 
     # Merge the existing data with the updated data, prioritizing the updated values
+    with_target_host(data)
     updated_subscription = {**subscription, **data}
 
     # Update only the modified fields in the database
@@ -109,6 +200,73 @@ async def update_subscription(sub_id: str, data: dict):
 
     # Cache the updated subscription (only modified fields)
     await set_cached_subscription(sub_id, updated_subscription)
+    invalidate_compiled_filters([sub_id])
 
     logger.info(f"Updated subscription with ID {sub_id} and cached the updated data.")
     return updated_subscription
+
+
+async def bulk_create_subscriptions(subscriptions: List[dict]):
+    """
+    Insert many subscriptions with one bulk write and cache them in one pipeline.
+
+    Args:
+        subscriptions (List[dict]): Subscription documents, each with an `_id`.
+    """
+    for data in subscriptions:
+        with_target_host(data)
+
+    # Cache only once stored, so failed inserts never become visible to ingest
+    await collection.bulk_write([InsertOne(data) for data in subscriptions], ordered=False)
+    await set_cached_subscriptions({data["_id"]: data for data in subscriptions})
+    logger.info(f"Created and cached {len(subscriptions)} subscriptions.")
+
+
+async def bulk_update_subscriptions(updates: Dict[str, dict]) -> List[dict]:
+    """
+    Apply field updates to many subscriptions with one bulk write and refresh their cache.
+
+    Args:
+        updates (Dict[str, dict]): Fields to set, keyed by subscription ID.
+
+    Returns:
+        List[dict]: The updated subscriptions. Unknown IDs are omitted.
+    """
+    if not updates:
+        return []
+
+    operations = [
+        UpdateOne({"_id": sub_id}, {"$set": with_target_host(data)})
+        for sub_id, data in updates.items()
+    ]
+    await collection.bulk_write(operations, ordered=False)
+
+    updated = await collection.find({"_id": {"$in": list(updates)}}).to_list(
+        length=len(updates)
+    )
+    await set_cached_subscriptions({sub["_id"]: sub for sub in updated})
+    invalidate_compiled_filters(list(updates))
+
+    logger.info(f"Updated and cached {len(updated)} subscriptions.")
+    return updated
+
+
+async def bulk_delete_subscriptions(sub_ids: List[str]) -> int:
+    """
+    Delete many subscriptions and invalidate their cache entries.
+
+    Args:
+        sub_ids (List[str]): The unique IDs of the subscriptions to delete.
+
+    Returns:
+        int: Number of subscriptions deleted.
+    """
+    if not sub_ids:
+        return 0
+
+    result = await collection.delete_many({"_id": {"$in": sub_ids}})
+    # Invalidate the cache
+    await invalidate_cached_subscriptions(sub_ids)
+    invalidate_compiled_filters(sub_ids)
+    logger.info(f"Deleted {result.deleted_count} subscriptions and invalidated cache.")
+    return result.deleted_count
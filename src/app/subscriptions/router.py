@@ -1,10 +1,20 @@
+import asyncio
 import logging
 import uuid
-from fastapi import APIRouter, HTTPException, status, Path
-from fastapi.responses import JSONResponse
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+from fastapi import APIRouter, HTTPException, status, Path, Query, Response
 from pydantic import BaseModel, Field
 
+from ..compression import is_supported
+from ..config import VALIDATE_TARGET_URLS
+from ..constants import MAX_BULK_SIZE
+from ..serialization import JSONResponse
 from ..subscriptions.models import (
+    bulk_create_subscriptions,
+    bulk_delete_subscriptions,
+    bulk_update_subscriptions,
     create_subscription,
     delete_subscription,
     get_subscription,
@@ -12,10 +22,16 @@ from ..subscriptions.models import (
     update_subscription,
 )
 from ..subscriptions.schemas import (
+    SubscriptionBulkCreate,
+    SubscriptionBulkDelete,
+    SubscriptionBulkDeleteOut,
+    SubscriptionBulkUpdate,
+    SubscriptionBulkUpdateOut,
     SubscriptionCreate,
     SubscriptionOut,
     SubscriptionUpdate,
 )
+from ..workers.dns import check_target_host
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Subscriptions"])
@@ -25,6 +41,48 @@ class ErrorResponse(BaseModel):
     detail: str = Field(..., example="Subscription not found")
 
 
+async def validate_target_urls(target_urls: Iterable[Optional[str]]):
+    """
+    Reject target URLs whose host does not resolve or is not allowed.
+
+    Each distinct host is resolved once, concurrently. Does nothing unless
+    `VALIDATE_TARGET_URLS` is enabled.
+
+    Args:
+        target_urls (Iterable[Optional[str]]): Target URLs being created or updated. None is skipped.
+
+    Raises:
+        HTTPException: 422 with the reason of the first rejected host.
+    """
+    if not VALIDATE_TARGET_URLS:
+        return
+
+    hosts = list(dict.fromkeys(urlparse(url).hostname for url in target_urls if url))
+    errors = await asyncio.gather(*(check_target_host(host) for host in hosts if host))
+    for error in errors:
+        if error:
+            raise HTTPException(status_code=422, detail=error)
+
+
+def validate_compression(encodings: Iterable[Optional[str]]):
+    """
+    Reject outbound compression encodings this deployment cannot produce.
+
+    `zstd` needs the optional `zstandard` package.
+
+    Args:
+        encodings (Iterable[Optional[str]]): Encodings being created or updated. None is skipped.
+
+    Raises:
+        HTTPException: 422 naming the first unavailable encoding.
+    """
+    for encoding in encodings:
+        if encoding and not is_supported(encoding):
+            raise HTTPException(
+                status_code=422, detail=f"Compression '{encoding}' is not available on this server"
+            )
+
+
 @router.post(
     "",
     response_model=SubscriptionOut,
@@ -41,12 +99,87 @@ async def add_subscription(payload: SubscriptionCreate):
     subscription_data = payload.model_dump(mode="json")
     subscription_data["_id"] = subscription_id
 
+    validate_compression([subscription_data["compression"]])
+    await validate_target_urls([subscription_data["target_url"]])
     await create_subscription(subscription_data)
 
     response_data = {"_id": subscription_id, **payload.model_dump(mode="json")}
     return JSONResponse(status_code=status.HTTP_201_CREATED, content=response_data)
 
 
+@router.post(
+    "/bulk",
+    response_model=list[SubscriptionOut],
+    status_code=status.HTTP_201_CREATED,
+    summary="Create subscriptions in bulk",
+    description=f"Create up to {MAX_BULK_SIZE} webhook subscriptions in a single request.",
+    response_description="The created subscriptions",
+    responses={
+        422: {"model": ErrorResponse, "description": "Validation error"},
+    },
+)
+async def add_subscriptions(payload: SubscriptionBulkCreate):
+    subscriptions = []
+    for item in payload.subscriptions:
+        subscription_data = item.model_dump(mode="json")
+        subscription_data["_id"] = str(uuid.uuid4())
+        subscriptions.append(subscription_data)
+
+    validate_compression(sub["compression"] for sub in subscriptions)
+    await validate_target_urls(sub["target_url"] for sub in subscriptions)
+    await bulk_create_subscriptions(subscriptions)
+
+    return subscriptions
+
+
+@router.put(
+    "/bulk",
+    response_model=SubscriptionBulkUpdateOut,
+    summary="Update subscriptions in bulk",
+    description=f"Update fields of up to {MAX_BULK_SIZE} existing subscriptions in a single request.",
+    response_description="The updated subscriptions and the IDs that were not found",
+    responses={
+        400: {"model": ErrorResponse, "description": "No fields to update"},
+        422: {"model": ErrorResponse, "description": "Validation error"},
+    },
+)
+async def edit_subscriptions(payload: SubscriptionBulkUpdate):
+    updates = {}
+    for item in payload.subscriptions:
+        item_data = item.model_dump(mode="json", exclude={"id"})
+        subscription_data = {k: v for k, v in item_data.items() if v is not None}
+        if not subscription_data:
+            raise HTTPException(
+                status_code=400, detail=f"No fields to update for subscription {item.id}"
+            )
+        updates[item.id] = subscription_data
+
+    validate_compression(data.get("compression") for data in updates.values())
+    await validate_target_urls(data.get("target_url") for data in updates.values())
+
+    updated = await bulk_update_subscriptions(updates)
+
+    found = {sub["_id"] for sub in updated}
+    return {"updated": updated, "not_found": [sub_id for sub_id in updates if sub_id not in found]}
+
+
+@router.post(
+    "/bulk/delete",
+    response_model=SubscriptionBulkDeleteOut,
+    summary="Delete subscriptions in bulk",
+    description=f"Delete up to {MAX_BULK_SIZE} webhook subscriptions in a single request.",
+    response_description="Number of deleted subscriptions",
+    responses={
+        422: {"model": ErrorResponse, "description": "Validation error"},
+    },
+)
+async def remove_subscriptions(payload: SubscriptionBulkDelete):
+    logger.info(f"Deleting {len(payload.ids)} subscriptions")
+    deleted_count = await bulk_delete_subscriptions(payload.ids)
+
+    return {"deleted_count": deleted_count}
+
+
 @router.get(
     "/{subscription_id}",
     response_model=SubscriptionOut,
@@ -71,12 +204,27 @@ async def read_subscription(
 @router.get(
     "",
     response_model=list[SubscriptionOut],
-    summary="List all subscriptions",
-    description="Retrieve a list of all active webhook subscriptions.",
-    response_description="List of subscriptions",
+    summary="List subscriptions",
+    description=(
+        "Retrieve a page of webhook subscriptions ordered by ID, optionally filtered by event type or target host. "
+        "When more subscriptions are available, the `X-Next-Cursor` response header holds the `cursor` for the next page."
+    ),
+    response_description="Page of subscriptions",
 )
-async def list_all_subscriptions():
-    return await list_subscriptions()
+async def list_all_subscriptions(
+    response: Response,
+    limit: int = Query(100, ge=1, le=MAX_BULK_SIZE, description="Number of subscriptions to return"),
+    cursor: Optional[str] = Query(None, description="Cursor returned in `X-Next-Cursor` by the previous page"),
+    event_type: Optional[str] = Query(None, description="Only return subscriptions for this event type"),
+    target_host: Optional[str] = Query(None, description="Only return subscriptions delivering to this host"),
+):
+    subscriptions = await list_subscriptions(
+        limit=limit, after=cursor, event_type=event_type, target_host=target_host
+    )
+    if len(subscriptions) == limit:
+        response.headers["X-Next-Cursor"] = subscriptions[-1]["_id"]
+
+    return subscriptions
 
 
 @router.put(
@@ -104,6 +252,8 @@ async def edit_subscription(
     if not subscription_data:
         raise HTTPException(status_code=400, detail="No fields to update")
 
+    validate_compression([subscription_data.get("compression")])
+    await validate_target_urls([subscription_data.get("target_url")])
     await update_subscription(subscription_id, subscription_data)
     updated = await get_subscription(subscription_id)
     return updated
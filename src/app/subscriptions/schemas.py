@@ -1,11 +1,44 @@
-from typing import List, Optional
+from typing import Any, List, Literal, Optional
 
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, model_validator
+
+from ..constants import MAX_BULK_SIZE
+
+Priority = Literal["high", "normal", "low"]  # delivery queue lane
+
+class RetryPolicy(BaseModel):
+    max_attempts: int = Field(6, ge=1, le=20)
+    base_delay: float = Field(10, gt=0)  # seconds before the first retry
+    max_delay: float = Field(900, gt=0)  # cap on a single backoff, in seconds
+    max_age: Optional[float] = Field(None, gt=0)  # give up this many seconds after the first attempt
+    jitter: bool = True
+
+class FilterCondition(BaseModel):
+    path: str = Field(..., min_length=1)  # dot-separated JSON path, e.g. "order.items.0.sku"
+    op: Literal["eq", "ne", "in", "nin", "gt", "gte", "lt", "lte", "exists"]
+    value: Any = None
+
+    @model_validator(mode="after")
+    def check_value(self):
+        if self.op in ("in", "nin") and not isinstance(self.value, list):
+            raise ValueError(f"'{self.op}' needs a list value")
+        if self.op in ("gt", "gte", "lt", "lte") and (
+            isinstance(self.value, bool) or not isinstance(self.value, (int, float))
+        ):
+            raise ValueError(f"'{self.op}' needs a numeric value")
+        if self.op == "exists" and not isinstance(self.value, (bool, type(None))):
+            raise ValueError("'exists' needs a boolean value")
+        return self
 
 class SubscriptionCreate(BaseModel):
     target_url: HttpUrl
     event_types: List[str]
     secret: Optional[str] = None
+    retry_policy: Optional[RetryPolicy] = None
+    compression: Optional[Literal["gzip", "zstd"]] = None  # outbound Content-Encoding
+    compression_min_size: Optional[int] = Field(None, ge=0)  # bytes; defaults to OUTBOUND_COMPRESSION_MIN_SIZE
+    filters: Optional[List[FilterCondition]] = None  # payload must match all conditions
+    priority: Priority = "normal"  # overridable per event with X-Webhook-Priority
 
 class SubscriptionOut(SubscriptionCreate):
     id: str = Field(..., alias="_id")
@@ -14,3 +47,27 @@ class SubscriptionUpdate(BaseModel):
     target_url: Optional[HttpUrl] = None
     event_types: Optional[List[str]] = None
     secret: Optional[str] = None
+    retry_policy: Optional[RetryPolicy] = None
+    compression: Optional[Literal["gzip", "zstd"]] = None
+    compression_min_size: Optional[int] = Field(None, ge=0)
+    filters: Optional[List[FilterCondition]] = None
+    priority: Optional[Priority] = None
+
+class SubscriptionBulkCreate(BaseModel):
+    subscriptions: List[SubscriptionCreate] = Field(..., min_length=1, max_length=MAX_BULK_SIZE)
+
+class SubscriptionBulkUpdateItem(SubscriptionUpdate):
+    id: str = Field(..., alias="_id")
+
+class SubscriptionBulkUpdate(BaseModel):
+    subscriptions: List[SubscriptionBulkUpdateItem] = Field(..., min_length=1, max_length=MAX_BULK_SIZE)
+
+class SubscriptionBulkUpdateOut(BaseModel):
+    updated: List[SubscriptionOut]
+    not_found: List[str]
+
+class SubscriptionBulkDelete(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_BULK_SIZE)
+
+class SubscriptionBulkDeleteOut(BaseModel):
+    deleted_count: int
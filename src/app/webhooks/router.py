@@ -1,31 +1,72 @@
 import hmac
+import asyncio
 import hashlib
 import json
 import logging
-from typing import List, Dict, Any, Optional
+from uuid import uuid4
+from typing import List, Any, Optional
+from datetime import datetime, timedelta, timezone
 
 from fastapi import (
     Request,
     Query,
-    Body,
     APIRouter,
     Header,
 )
-from fastapi.responses import JSONResponse
 
+from ..cache import get_compiled_filter
+from ..constants import DEFAULT_PRIORITY, PRIORITY_CLASSES
+from ..delivery_logs.models import create_delivery_log, record_final_status
+from ..delivery_logs.payloads import store_payload
+from ..serialization import JSONResponse, loads
 from ..subscriptions.models import get_subscription
+from ..workers.checkpoint import drain_event
+from ..workers.scheduler import schedule_delivery
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Webhook Ingestion"])
 
 
+def signature_matches(secret: str, raw_body: bytes, body: Any, signature: str) -> bool:
+    """
+    Check an `X-Hub-Signature-256` header against the request body.
+
+    The signature is checked against the raw body bytes first. Senders that sign
+    their own compact re-serialization of the payload are also accepted.
+
+    Args:
+        secret (str): The subscription secret.
+        raw_body (bytes): The request body as received.
+        body (Any): The parsed payload.
+        signature (str): The header value, `sha256=<digest>`.
+
+    Returns:
+        bool: True if the signature is valid.
+    """
+    key = secret.encode()
+    expected = "sha256=" + hmac.new(key, raw_body, hashlib.sha256).hexdigest()
+    if hmac.compare_digest(signature, expected):
+        return True
+
+    # Same bytes as the senders' `json.dumps(payload, separators=(",", ":"))`
+    compact = json.dumps(body, separators=(",", ":")).encode()
+    if compact == raw_body:
+        return False
+    expected = "sha256=" + hmac.new(key, compact, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature, expected)
+
+
 @router.post(
     "/{sub_id}",
     summary="Ingest webhook event",
     description=(
         "Accepts a webhook payload for a given subscription ID. If a secret is configured for the subscription, "
         "the request must be signed using HMAC-SHA256 and included in the `X-Hub-Signature-256` header. "
-        "The endpoint supports optional event type validation and queues the webhook for background processing."
+        "The endpoint supports optional event type validation and queues the webhook for background processing. "
+        "The returned `delivery_id` can be used to follow the delivery through `/status/delivery/{delivery_id}`. "
+        "Use `deliver_at` or `delay` to schedule the delivery for later. "
+        "`X-Webhook-Priority` (`high`, `normal` or `low`) overrides the subscription's delivery priority. "
+        "Events not matching the subscription's `filters` are acknowledged but not delivered."
     ),
     response_description="Webhook accepted and queued",
     responses={
@@ -33,12 +74,19 @@ router = APIRouter(tags=["Webhook Ingestion"])
         403: {"description": "Invalid or missing signature / Event not subscribed"},
         404: {"description": "Subscription not found"},
         422: {"description": "Validation error"},
+        503: {"description": "Service is shutting down or the delivery queue is full"},
+    },
+    # The body is read and parsed by the handler with the fast JSON codec
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": {"type": "object"}}},
+        }
     },
 )
 async def ingest_webhook(
     sub_id: str,
     request: Request,
-    body: Dict[str, Any] = Body(..., media_type="application/json"),
     event_types: List[str] = Query(
         default=[], description="List of event types being sent in this webhook. Leave empty to trigger all events."
     ),
@@ -47,26 +95,81 @@ async def ingest_webhook(
         convert_underscores=False,
         description="HMAC SHA256 signature in the format: sha256=<digest>",
     ),
+    deliver_at: Optional[datetime] = Query(
+        default=None, description="Deliver at this time (ISO 8601, UTC if no offset is given)."
+    ),
+    delay: Optional[int] = Query(
+        default=None, ge=0, description="Deliver after this many seconds."
+    ),
+    x_webhook_priority: Optional[str] = Header(
+        default=None,
+        alias="X-Webhook-Priority",
+        description="Delivery priority of this event: high, normal or low.",
+    ),
 ) -> JSONResponse:
     """
     Ingests a webhook request for a given subscription.
 
     Args:
         sub_id (str): Subscription ID that identifies the webhook subscription.
-        background_tasks (BackgroundTasks): FastAPI background task handler.
-        request (Request): Incoming HTTP request object.
-        body (Dict[str, Any]): JSON payload of the webhook.
+        request (Request): Incoming HTTP request object, whose body is the JSON payload.
         event_types (List[str]): Optional list of event types included in the payload.
         x_hub_signature_256 (Optional[str]): Optional HMAC-SHA256 signature header.
+        deliver_at (Optional[datetime]): Optional time to deliver the webhook at.
+        delay (Optional[int]): Optional delay in seconds before delivering the webhook.
+        x_webhook_priority (Optional[str]): Optional priority overriding the subscription's.
 
     Returns:
-        JSONResponse: Status 202 if accepted, or appropriate error message otherwise.
+        JSONResponse: Status 202 with the delivery ID if accepted, or appropriate error message otherwise.
     """
-    logger.info(f"Received request to ingest webhook for subscription ID: {sub_id}")
+    logger.info(
+        "Received request to ingest webhook for subscription ID: %s",
+        sub_id,
+        extra={"event": "ingest.received", "subscription_id": sub_id},
+    )
+
+    if drain_event.is_set():
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Service is shutting down"},
+            headers={"Retry-After": "5"},
+        )
+
+    raw_body = await request.body()
+    try:
+        body = loads(raw_body)
+    except ValueError:
+        return JSONResponse(status_code=422, content={"detail": "Body must be valid JSON"})
+    if not isinstance(body, dict):
+        return JSONResponse(status_code=422, content={"detail": "Body must be a JSON object"})
+
+    if x_webhook_priority is not None and x_webhook_priority not in PRIORITY_CLASSES:
+        return JSONResponse(
+            status_code=422,
+            content={"detail": f"Priority must be one of: {', '.join(PRIORITY_CLASSES)}"},
+        )
+
+    if deliver_at is not None and delay is not None:
+        return JSONResponse(
+            status_code=422, content={"detail": "Use either deliver_at or delay, not both"}
+        )
+
+    now = datetime.now(timezone.utc)
+    due_at = None
+    if delay:
+        due_at = now + timedelta(seconds=delay)
+    elif deliver_at is not None:
+        due_at = deliver_at if deliver_at.tzinfo else deliver_at.replace(tzinfo=timezone.utc)
+    if due_at is not None and due_at <= now:
+        due_at = None  # Already due, deliver right away
 
     sub = await get_subscription(sub_id)
     if not sub:
-        logger.warning(f"No subscription found for ID: {sub_id}")
+        logger.warning(
+            "No subscription found for ID: %s",
+            sub_id,
+            extra={"event": "ingest.unknown_subscription", "subscription_id": sub_id},
+        )
         return JSONResponse(
             status_code=404, content={"detail": "Subscription not found"}
         )
@@ -77,15 +180,11 @@ async def ingest_webhook(
                 status_code=403, content={"detail": "Missing signature"}
             )
 
-        body_bytes = json.dumps(body, separators=(",", ":")).encode()
-        expected_signature = hmac.new(
-            sub["secret"].encode(), body_bytes, hashlib.sha256
-        ).hexdigest()
-        full_expected = f"sha256={expected_signature}"
-
-        if x_hub_signature_256 != full_expected:
+        if not signature_matches(sub["secret"], raw_body, body, x_hub_signature_256):
             logger.warning(
-                f"Signature mismatch: expected {full_expected}, got {x_hub_signature_256}"
+                "Signature mismatch for subscription %s",
+                sub_id,
+                extra={"event": "ingest.bad_signature", "subscription_id": sub_id},
             )
             return JSONResponse(
                 status_code=403, content={"detail": "Invalid signature"}
@@ -95,22 +194,100 @@ async def ingest_webhook(
         allowed_types = sub.get("event_types", [])
         if allowed_types and not any(et in allowed_types for et in event_types):
             logger.warning(
-                f"Rejected event types {event_types}; allowed: {allowed_types}"
+                "Rejected event types %s; allowed: %s",
+                event_types,
+                allowed_types,
+                extra={"event": "ingest.rejected_event_types", "subscription_id": sub_id},
             )
             return JSONResponse(
                 status_code=403, content={"detail": "Event not subscribed"}
             )
 
+    # Drop events the receiver filtered out before they cost anything downstream
+    predicate = get_compiled_filter(sub)
+    if predicate and not predicate(body):
+        logger.info(
+            "Event for subscription %s did not match its filters",
+            sub_id,
+            extra={"event": "ingest.filtered", "subscription_id": sub_id},
+        )
+        return JSONResponse(status_code=202, content={"detail": "Filtered"})
+
+    queue = request.app.state.queue
+    if not due_at and queue.full():
+        logger.warning(
+            "Delivery queue is full, rejecting event for subscription %s",
+            sub_id,
+            extra={"event": "ingest.queue_full", "subscription_id": sub_id},
+        )
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Delivery queue is full"},
+            headers={"Retry-After": "5"},
+        )
+
+    # Persist the delivery log up front so in-flight deliveries are visible
+    delivery_id = str(uuid4())
+    payload_ref = await store_payload(body, referenced_until=due_at)
+    log_entry = {
+        "_id": delivery_id,
+        "subscription_id": sub["_id"],
+        "target_url": sub["target_url"],
+        "event_types": sub.get("event_types", []),
+        "payload_ref": payload_ref,
+        "attempts": [],
+        "final_status": "pending",
+        "created_at": now,
+    }
+    if due_at:
+        log_entry["final_status"] = "scheduled"
+        log_entry["deliver_at"] = due_at
+    await create_delivery_log(log_entry)
+
+    task = {
+        "delivery_id": delivery_id,
+        "sub_id": sub_id,
+        "payload": body,
+        "payload_ref": payload_ref,
+        "event_types": event_types or [],
+        "priority": x_webhook_priority or sub.get("priority", DEFAULT_PRIORITY),
+    }
+
+    if due_at:
+        await schedule_delivery(task, due_at)
+        return JSONResponse(
+            status_code=202,
+            content={
+                "detail": "Scheduled",
+                "delivery_id": delivery_id,
+                "deliver_at": due_at.isoformat(),
+            },
+        )
+
     # Add webhook task to background queue
     logger.info(
-        f"Webhook task queued for subscription {sub_id} with event types: {event_types}"
-    )
-    request.app.state.queue.put_nowait(
-        {
-            "sub_id": sub_id,
-            "payload": body,
-            "event_types": event_types or [],
-        }
+        "Webhook task %s queued for subscription %s with event types: %s",
+        delivery_id,
+        sub_id,
+        event_types,
+        extra={"event": "ingest.queued", "delivery_id": delivery_id, "subscription_id": sub_id},
     )
+    try:
+        queue.put_nowait(task)
+    except asyncio.QueueFull:
+        # Filled up while the log was being written; the sender is told to retry
+        record_final_status(delivery_id, "failed")
+        logger.warning(
+            "Delivery queue is full, dropping delivery %s",
+            delivery_id,
+            extra={"event": "ingest.queue_full", "delivery_id": delivery_id, "subscription_id": sub_id},
+        )
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Delivery queue is full", "delivery_id": delivery_id},
+            headers={"Retry-After": "5"},
+        )
 
-    return JSONResponse(status_code=202, content={"detail": "Accepted"})
+    return JSONResponse(
+        status_code=202, content={"detail": "Accepted", "delivery_id": delivery_id}
+    )
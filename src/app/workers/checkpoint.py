@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from uuid import uuid4
+from typing import List
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ReplaceOne
+
+from ..database import db
+from .queue import PriorityDeliveryQueue
+
+logger = logging.getLogger(__name__)
+collection = db.pending_deliveries
+
+# Set when the service starts draining: intake stops and backoff sleeps are cut short
+drain_event = asyncio.Event()
+
+CLAIM_LEASE = timedelta(minutes=10)  # claims older than this are picked up again
+RESTORE_BATCH_SIZE = 100
+
+
+async def save_checkpoints(items: List[dict]):
+    """
+    Persist queued or pending-retry deliveries so they survive a restart.
+
+    Items are keyed by delivery ID, so checkpointing the same delivery twice is harmless.
+
+    Args:
+        items (List[dict]): Queue items, each with at least a `delivery_id`.
+    """
+    if not items:
+        return
+
+    now = datetime.now(timezone.utc)
+    operations = [
+        ReplaceOne(
+            {"_id": item["delivery_id"]},
+            {"_id": item["delivery_id"], "item": item, "checkpointed_at": now},
+            upsert=True,
+        )
+        for item in items
+    ]
+    await collection.bulk_write(operations, ordered=False)
+    logger.info(f"Checkpointed {len(items)} deliveries for the next start.")
+
+
+async def restore_checkpoints(queue: PriorityDeliveryQueue):
+    """
+    Claim checkpointed deliveries and put them back on the queue.
+
+    Deliveries are claimed before being enqueued, so several instances starting at
+    once do not restore the same delivery twice. A claim left behind by a crash
+    expires after `CLAIM_LEASE`.
+
+    Args:
+        queue (PriorityDeliveryQueue): The delivery queue.
+    """
+    owner = str(uuid4())
+    now = datetime.now(timezone.utc)
+    await collection.update_many(
+        {
+            "$or": [
+                {"claimed_by": None},
+                {"claimed_at": {"$lt": now - CLAIM_LEASE}},
+            ]
+        },
+        {"$set": {"claimed_by": owner, "claimed_at": now}},
+    )
+
+    restored = 0
+    batch = []
+    try:
+        async for doc in collection.find({"claimed_by": owner}):
+            await queue.put(doc["item"])
+            batch.append(doc["_id"])
+            if len(batch) >= RESTORE_BATCH_SIZE:
+                await _delete_restored(batch, owner)
+                restored += len(batch)
+                batch = []
+    finally:
+        # Also runs when cancelled by a drain, which checkpoints what was enqueued
+        if batch:
+            await _delete_restored(batch, owner)
+            restored += len(batch)
+
+    if restored:
+        logger.info(f"Restored {restored} checkpointed deliveries.")
+
+
+async def _delete_restored(delivery_ids: List[str], owner: str):
+    # A worker re-checkpointing one of these during a drain replaces the document
+    # without the claim, so only documents still claimed by this restore are deleted
+    await collection.delete_many({"_id": {"$in": delivery_ids}, "claimed_by": owner})
@@ -0,0 +1,325 @@
+import time
+import socket
+import asyncio
+import logging
+import ipaddress
+import contextlib
+from collections import OrderedDict
+from urllib.request import getproxies
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+import httpcore
+
+from ..config import BLOCK_PRIVATE_TARGETS, DNS_CACHE_TTL, DNS_NEGATIVE_CACHE_TTL
+from ..constants import MAX_DNS_CACHE_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+# httpx only honours HTTP(S)_PROXY/ALL_PROXY with its default transport
+PROXY_CONFIGURED = any(scheme in getproxies() for scheme in ("http", "https", "all"))
+
+# Prefixes of connect errors raised by the delivery transport, matched by the workers
+DNS_FAILURE = "DNS resolution failed"
+BLOCKED_TARGET = "Target address is blocked"
+
+
+class UnresolvableHost(Exception):
+    """Raised when a host name does not resolve, including from the negative cache."""
+
+
+def is_blocked_address(address: str) -> bool:
+    """
+    Check whether an IP address is outside the public internet.
+
+    Private, loopback, link-local, shared and reserved ranges are blocked, including
+    IPv4 addresses mapped into IPv6.
+
+    Args:
+        address (str): An IPv4 or IPv6 address.
+
+    Returns:
+        bool: True if webhooks must not be delivered to this address.
+    """
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return not ip.is_global or ip.is_multicast
+
+
+def _ip_literal(host: str) -> Optional[str]:
+    try:
+        return str(ipaddress.ip_address(host.strip("[]")))
+    except ValueError:
+        return None
+
+
+class DNSCache:
+    """
+    Async host name cache with a fixed TTL and negative caching.
+
+    Lookups run through the event loop's `getaddrinfo`. Concurrent lookups of the same
+    host share one resolution, and failures are remembered for `negative_ttl` seconds
+    so unresolvable targets fail at once instead of hitting the resolver again.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DNS_CACHE_TTL,
+        negative_ttl: float = DNS_NEGATIVE_CACHE_TTL,
+        max_entries: int = MAX_DNS_CACHE_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        # host -> (expires_at, addresses or None, error message)
+        self.entries: "OrderedDict[str, Tuple[float, Optional[List[str]], str]]" = OrderedDict()
+        self.pending: Dict[str, asyncio.Future] = {}
+
+    async def resolve(self, host: str) -> List[str]:
+        """
+        Resolve a host name to its IP addresses, using the cache when possible.
+
+        Args:
+            host (str): Host name or IP literal.
+
+        Returns:
+            List[str]: The addresses, in resolver order.
+
+        Raises:
+            UnresolvableHost: If the host does not resolve.
+        """
+        literal = _ip_literal(host)
+        if literal:
+            return [literal]
+
+        host = host.lower()
+        entry = self.entries.get(host)
+        if entry and entry[0] > time.monotonic():
+            self.entries.move_to_end(host)
+            if entry[1] is None:
+                raise UnresolvableHost(entry[2])
+            return entry[1]
+
+        lookup = self.pending.get(host)
+        if lookup is None:
+            lookup = asyncio.ensure_future(self._lookup(host))
+            # Retrieve the outcome even if every caller gave up waiting
+            lookup.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self.pending[host] = lookup
+        # A caller timing out must not cancel the lookup shared with the others
+        return await asyncio.shield(lookup)
+
+    async def _lookup(self, host: str) -> List[str]:
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        except (socket.gaierror, UnicodeError) as exc:
+            error = f"{host}: {getattr(exc, 'strerror', None) or exc}"
+            self._store(host, None, error, self.negative_ttl)
+            raise UnresolvableHost(error)
+        finally:
+            self.pending.pop(host, None)
+
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._store(host, addresses, "", self.ttl)
+        return addresses
+
+    def _store(self, host: str, addresses: Optional[List[str]], error: str, ttl: float):
+        self.entries[host] = (time.monotonic() + ttl, addresses, error)
+        self.entries.move_to_end(host)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+dns_cache = DNSCache()
+
+
+async def check_target_host(host: str, block_private: bool = BLOCK_PRIVATE_TARGETS) -> Optional[str]:
+    """
+    Check that a subscription target host resolves and is allowed.
+
+    The resolution is cached, so the first delivery to the host skips the resolver.
+
+    Args:
+        host (str): Host name of the target URL.
+        block_private (bool, optional): Reject hosts resolving only to non-public
+            addresses. Defaults to `BLOCK_PRIVATE_TARGETS`.
+
+    Returns:
+        Optional[str]: Why the host is rejected, or None if it is valid.
+    """
+    try:
+        addresses = await dns_cache.resolve(host)
+    except UnresolvableHost:
+        return f"Target host {host} does not resolve"
+
+    if block_private and all(is_blocked_address(address) for address in addresses):
+        return f"Target host {host} resolves to a private or reserved address"
+    return None
+
+
+class CachingNetworkBackend(httpcore.AnyIOBackend):
+    """
+    httpcore network backend resolving host names through `dns_cache`.
+
+    Connections are opened to the resolved addresses in order. TLS still verifies
+    and sends SNI for the original host name, since httpcore passes it separately.
+    Resolution counts against the connect timeout.
+    """
+
+    def __init__(self, block_private: bool = BLOCK_PRIVATE_TARGETS):
+        self.block_private = block_private
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options=None,
+    ) -> httpcore.AsyncNetworkStream:
+        started = time.monotonic()
+        try:
+            addresses = await asyncio.wait_for(dns_cache.resolve(host), timeout)
+        except asyncio.TimeoutError:
+            raise httpcore.ConnectTimeout(f"{DNS_FAILURE}: {host} timed out")
+        except UnresolvableHost as exc:
+            raise httpcore.ConnectError(f"{DNS_FAILURE}: {exc}")
+
+        if self.block_private:
+            # Checked on every connection, so a host re-pointed after validation is caught
+            addresses = [address for address in addresses if not is_blocked_address(address)]
+            if not addresses:
+                raise httpcore.ConnectError(f"{BLOCKED_TARGET}: {host}")
+
+        error: Optional[Exception] = None
+        for address in addresses:
+            remaining = None
+            if timeout is not None:
+                remaining = timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise httpcore.ConnectTimeout(f"Connecting to {host} timed out")
+            try:
+                return await super().connect_tcp(
+                    address,
+                    port,
+                    timeout=remaining,
+                    local_address=local_address,
+                    socket_options=socket_options,
+                )
+            except httpcore.ConnectError as exc:
+                error = exc
+        raise error
+
+
+# httpcore exceptions and their httpx equivalents, most specific first
+_EXCEPTION_MAP = [
+    (getattr(httpcore, name), getattr(httpx, name))
+    for name in (
+        "ConnectTimeout",
+        "ReadTimeout",
+        "WriteTimeout",
+        "PoolTimeout",
+        "TimeoutException",
+        "ConnectError",
+        "ReadError",
+        "WriteError",
+        "NetworkError",
+        "RemoteProtocolError",
+        "LocalProtocolError",
+        "ProtocolError",
+        "ProxyError",
+        "UnsupportedProtocol",
+    )
+]
+
+
+@contextlib.contextmanager
+def _map_exceptions() -> Iterator[None]:
+    try:
+        yield
+    except Exception as exc:
+        for httpcore_exc, httpx_exc in _EXCEPTION_MAP:
+            if isinstance(exc, httpcore_exc):
+                raise httpx_exc(str(exc)) from exc
+        raise
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream):
+        self._stream = stream
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        with _map_exceptions():
+            async for part in self._stream:
+                yield part
+
+    async def aclose(self):
+        if hasattr(self._stream, "aclose"):
+            await self._stream.aclose()
+
+
+class DeliveryTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport for webhook deliveries, resolving hosts through `dns_cache`.
+
+    Wraps an httpcore connection pool using `CachingNetworkBackend`, with the same
+    TLS verification and pool limits as httpx's default transport.
+    """
+
+    def __init__(
+        self,
+        block_private: bool = BLOCK_PRIVATE_TARGETS,
+        limits: httpx.Limits = httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    ):
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            network_backend=CachingNetworkBackend(block_private),
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _map_exceptions():
+            response = await self._pool.handle_async_request(core_request)
+
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_ResponseStream(response.stream),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        await self._pool.aclose()
+
+
+def delivery_transport() -> Optional[httpx.AsyncBaseTransport]:
+    """
+    Return the transport for a delivery client.
+
+    Behind an egress proxy (`HTTP_PROXY`, `HTTPS_PROXY` or `ALL_PROXY`), None is
+    returned so httpx's default transport sends deliveries through the proxy and
+    honours `NO_PROXY`. The proxy resolves the targets then, so the DNS cache and
+    the per-connection private address check are skipped.
+
+    Returns:
+        Optional[httpx.AsyncBaseTransport]: A `DeliveryTransport`, or None for httpx's default.
+    """
+    if PROXY_CONFIGURED:
+        return None
+    return DeliveryTransport()
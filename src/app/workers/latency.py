@@ -0,0 +1,133 @@
+import math
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from ..config import (
+    ADAPTIVE_TIMEOUT_FACTOR,
+    ADAPTIVE_TIMEOUT_MIN,
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES,
+    REQUEST_TIMEOUT,
+)
+
+EWMA_ALPHA = 0.2  # weight of the newest sample
+SKETCH_RELATIVE_ACCURACY = 0.02
+SKETCH_DECAY_EVERY = 1000  # samples between halving the sketch counts
+MAX_TRACKED_HOSTS = 10000
+
+
+class LatencySketch:
+    """
+    Log-bucketed quantile sketch with a bounded relative error.
+
+    Counts are halved every `SKETCH_DECAY_EVERY` samples so quantiles follow
+    recent behaviour of the host rather than its whole history.
+    """
+
+    def __init__(self, relative_accuracy: float = SKETCH_RELATIVE_ACCURACY):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, float] = {}
+        self.count = 0.0
+        self.samples_since_decay = 0
+
+    def add(self, value: float):
+        index = math.ceil(math.log(max(value, 1e-6)) / self.log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0.0) + 1
+        self.count += 1
+        self.samples_since_decay += 1
+        if self.samples_since_decay >= SKETCH_DECAY_EVERY:
+            self._decay()
+
+    def _decay(self):
+        self.buckets = {
+            index: count / 2 for index, count in self.buckets.items() if count >= 1
+        }
+        self.count = sum(self.buckets.values())
+        self.samples_since_decay = 0
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return 2 * self.gamma**index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+class HostLatency:
+    """Latency statistics of a single receiver host, in seconds."""
+
+    def __init__(self):
+        self.ewma: Optional[float] = None
+        self.sketch = LatencySketch()
+        self.samples = 0
+
+    def add(self, latency: float):
+        self.ewma = (
+            latency if self.ewma is None else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.ewma
+        )
+        self.sketch.add(latency)
+        self.samples += 1
+
+
+class HostLatencyTracker:
+    """
+    Track per-host latency and derive adaptive request timeouts from it.
+
+    Until a host has `min_samples` samples, the global `max_timeout` is used.
+    After that the timeout is the larger of p99 and the EWMA, times `factor`,
+    clamped between `min_timeout` and `max_timeout`.
+    """
+
+    def __init__(
+        self,
+        factor: float = ADAPTIVE_TIMEOUT_FACTOR,
+        min_timeout: float = ADAPTIVE_TIMEOUT_MIN,
+        max_timeout: float = REQUEST_TIMEOUT,
+        min_samples: int = ADAPTIVE_TIMEOUT_MIN_SAMPLES,
+    ):
+        self.factor = factor
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_samples = min_samples
+        self.hosts: "OrderedDict[str, HostLatency]" = OrderedDict()
+
+    def record(self, host: str, latency: float):
+        """
+        Record the latency of a request to a host.
+
+        Args:
+            host (str): The receiver host.
+            latency (float): Request duration in seconds. Timeouts should pass the timeout used.
+        """
+        stats = self.hosts.get(host)
+        if stats is None:
+            stats = self.hosts[host] = HostLatency()
+            if len(self.hosts) > MAX_TRACKED_HOSTS:
+                self.hosts.popitem(last=False)
+        else:
+            self.hosts.move_to_end(host)
+        stats.add(latency)
+
+    def timeout_for(self, host: str) -> float:
+        """
+        Return the request timeout to use for a host.
+
+        Args:
+            host (str): The receiver host.
+
+        Returns:
+            float: Timeout in seconds.
+        """
+        stats = self.hosts.get(host)
+        if stats is None or stats.samples < self.min_samples:
+            return self.max_timeout
+        p99 = stats.sketch.quantile(0.99) or 0.0
+        timeout = max(p99, stats.ewma or 0.0) * self.factor
+        return min(self.max_timeout, max(self.min_timeout, timeout))
+
+
+latency_tracker = HostLatencyTracker()
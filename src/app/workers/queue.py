@@ -0,0 +1,282 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Tuple
+
+from ..config import PRIORITY_DEQUEUE, PRIORITY_WEIGHTS
+from ..constants import DEFAULT_PRIORITY, PRIORITY_CLASSES
+from .latency import LatencySketch
+
+logger = logging.getLogger(__name__)
+
+
+def parse_priority_weights(spec: str) -> Dict[str, int]:
+    """
+    Parse lane weights such as "high:8,normal:3,low:1".
+
+    Lanes missing from the spec get a weight of 1.
+
+    Args:
+        spec (str): Comma-separated `lane:weight` pairs.
+
+    Returns:
+        Dict[str, int]: Weight per priority class.
+    """
+    weights = {priority: 1 for priority in PRIORITY_CLASSES}
+    for part in filter(None, (part.strip() for part in spec.split(","))):
+        lane, _, weight = part.partition(":")
+        if lane not in weights or not weight.strip().isdigit() or int(weight) < 1:
+            logger.warning(f"Ignoring invalid priority weight '{part}'")
+            continue
+        weights[lane] = int(weight)
+    return weights
+
+
+def priority_of(item: Optional[dict]) -> str:
+    """
+    Return the lane a queue item belongs to.
+
+    Args:
+        item (Optional[dict]): A queue item.
+
+    Returns:
+        str: Its priority class, or `DEFAULT_PRIORITY` if unset or unknown.
+    """
+    priority = item.get("priority") if item else None
+    return priority if priority in PRIORITY_CLASSES else DEFAULT_PRIORITY
+
+
+class LaneMetrics:
+    """Counters and queue wait distribution of one priority lane, in seconds."""
+
+    def __init__(self):
+        self.enqueued = 0
+        self.dequeued = 0
+        self.wait = LatencySketch()
+
+    def snapshot(self, depth: int) -> dict:
+        return {
+            "depth": depth,
+            "enqueued": self.enqueued,
+            "dequeued": self.dequeued,
+            "wait_p50_ms": _to_ms(self.wait.quantile(0.50)),
+            "wait_p95_ms": _to_ms(self.wait.quantile(0.95)),
+            "wait_p99_ms": _to_ms(self.wait.quantile(0.99)),
+        }
+
+
+def _to_ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+class PriorityDeliveryQueue:
+    """
+    Delivery queue with one FIFO lane per priority class.
+
+    Offers the subset of the `asyncio.Queue` interface the service uses. In "strict"
+    mode the most urgent non-empty lane is always served first. In "weighted" mode
+    lanes are served by smooth weighted round robin, so lower lanes keep a share
+    of the workers under sustained high-priority load.
+
+    `None` shutdown sentinels bypass the lanes and are only handed out once the
+    lanes a worker reads from are empty. Workers may restrict `get` to some lanes,
+    which is how workers reserved for urgent events are kept off bulk traffic.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        mode: str = PRIORITY_DEQUEUE,
+        weights: Optional[Dict[str, int]] = None,
+    ):
+        if mode not in ("strict", "weighted"):
+            logger.warning(f"Unknown priority dequeue mode '{mode}', using 'weighted'")
+            mode = "weighted"
+        self.maxsize = maxsize
+        self.mode = mode
+        self.weights = weights or parse_priority_weights(PRIORITY_WEIGHTS)
+        self.metrics = {priority: LaneMetrics() for priority in PRIORITY_CLASSES}
+        self._lanes: Dict[str, Deque[Tuple[float, dict]]] = {
+            priority: deque() for priority in PRIORITY_CLASSES
+        }
+        self._credits = {priority: 0 for priority in PRIORITY_CLASSES}
+        self._sentinels = 0
+        self._getters: Deque[Tuple[asyncio.Future, Optional[Tuple[str, ...]]]] = deque()
+        self._putters: Deque[asyncio.Future] = deque()
+        self._unfinished_tasks = 0
+        self._finished = asyncio.Event()
+        self._finished.set()
+
+    def qsize(self) -> int:
+        """Number of events waiting, excluding shutdown sentinels."""
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def empty(self) -> bool:
+        return not self.qsize() and not self._sentinels
+
+    def full(self) -> bool:
+        return 0 < self.maxsize <= self.qsize()
+
+    def put_nowait(self, item: Optional[dict]):
+        """
+        Put an item in its lane without blocking.
+
+        Raises:
+            asyncio.QueueFull: If the queue is at `maxsize`. Sentinels are always accepted.
+        """
+        if item is None:
+            self._sentinels += 1
+        else:
+            if self.full():
+                raise asyncio.QueueFull
+            priority = priority_of(item)
+            self._lanes[priority].append((time.monotonic(), item))
+            self.metrics[priority].enqueued += 1
+        self._unfinished_tasks += 1
+        self._finished.clear()
+        self._wakeup_getter()
+
+    async def put(self, item: Optional[dict]):
+        """Put an item in its lane, waiting for room if the queue is full."""
+        while item is not None and self.full():
+            putter = asyncio.get_running_loop().create_future()
+            self._putters.append(putter)
+            try:
+                await putter
+            except BaseException:
+                putter.cancel()
+                if putter in self._putters:
+                    self._putters.remove(putter)
+                if not self.full() and not putter.cancelled():
+                    self._wakeup_next(self._putters)
+                raise
+        self.put_nowait(item)
+
+    def get_nowait(self, lanes: Optional[Iterable[str]] = None) -> Optional[dict]:
+        """
+        Take the next item without blocking.
+
+        Args:
+            lanes (Optional[Iterable[str]], optional): Only take from these lanes. Defaults to all.
+
+        Returns:
+            Optional[dict]: The item, or None for a shutdown sentinel.
+
+        Raises:
+            asyncio.QueueEmpty: If nothing can be taken.
+        """
+        lanes = tuple(lanes) if lanes is not None else None
+        priority = self._next_lane(lanes)
+        if priority is None:
+            if not self._sentinels:
+                raise asyncio.QueueEmpty
+            self._sentinels -= 1
+            return None
+
+        enqueued_at, item = self._lanes[priority].popleft()
+        metrics = self.metrics[priority]
+        metrics.dequeued += 1
+        metrics.wait.add(time.monotonic() - enqueued_at)
+        self._wakeup_next(self._putters)
+        return item
+
+    async def get(self, lanes: Optional[Iterable[str]] = None) -> Optional[dict]:
+        """
+        Take the next item, waiting until one is available.
+
+        Args:
+            lanes (Optional[Iterable[str]], optional): Only take from these lanes. Defaults to all.
+
+        Returns:
+            Optional[dict]: The item, or None for a shutdown sentinel.
+        """
+        lanes = tuple(lanes) if lanes is not None else None
+        while not self._available(lanes):
+            getter = asyncio.get_running_loop().create_future()
+            entry = (getter, lanes)
+            self._getters.append(entry)
+            try:
+                await getter
+            except BaseException:
+                getter.cancel()
+                if entry in self._getters:
+                    self._getters.remove(entry)
+                if not getter.cancelled():
+                    # Woken and cancelled at once: pass the wakeup on
+                    self._wakeup_getter()
+                raise
+        return self.get_nowait(lanes)
+
+    def task_done(self):
+        if self._unfinished_tasks <= 0:
+            raise ValueError("task_done() called too many times")
+        self._unfinished_tasks -= 1
+        if self._unfinished_tasks == 0:
+            self._finished.set()
+
+    async def join(self):
+        if self._unfinished_tasks > 0:
+            await self._finished.wait()
+
+    def snapshot(self) -> dict:
+        """
+        Return per-lane depth, throughput counters and queue wait percentiles.
+
+        Returns:
+            dict: The dequeue mode, lane weights and metrics per priority class.
+        """
+        return {
+            "mode": self.mode,
+            "weights": dict(self.weights),
+            "size": self.qsize(),
+            "maxsize": self.maxsize,
+            "lanes": {
+                priority: self.metrics[priority].snapshot(len(self._lanes[priority]))
+                for priority in PRIORITY_CLASSES
+            },
+        }
+
+    def _available(self, lanes: Optional[Tuple[str, ...]]) -> bool:
+        return bool(self._sentinels) or any(
+            self._lanes[priority] for priority in (lanes or PRIORITY_CLASSES)
+        )
+
+    def _next_lane(self, lanes: Optional[Tuple[str, ...]]) -> Optional[str]:
+        candidates = [
+            priority
+            for priority in PRIORITY_CLASSES
+            if self._lanes[priority] and (lanes is None or priority in lanes)
+        ]
+        if not candidates:
+            return None
+        if self.mode == "strict" or len(candidates) == 1:
+            return candidates[0]
+
+        # Smooth weighted round robin over the lanes that have work
+        total = 0
+        for priority in candidates:
+            self._credits[priority] += self.weights[priority]
+            total += self.weights[priority]
+        chosen = max(candidates, key=lambda priority: self._credits[priority])
+        self._credits[chosen] -= total
+        return chosen
+
+    def _wakeup_getter(self):
+        for entry in list(self._getters):
+            getter, lanes = entry
+            if getter.done():
+                self._getters.remove(entry)
+            elif self._available(lanes):
+                self._getters.remove(entry)
+                getter.set_result(None)
+                return
+
+    @staticmethod
+    def _wakeup_next(waiters: Deque[asyncio.Future]):
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
@@ -0,0 +1,93 @@
+import random
+from typing import Optional
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from ..constants import RETRY_INTERVALS
+
+# 4xx responses that are worth retrying; any other 4xx is a permanent failure
+RETRYABLE_CLIENT_ERRORS = {408, 425, 429}
+
+
+def is_permanent_failure(status_code: int) -> bool:
+    """
+    Check whether an HTTP status means retrying cannot succeed (e.g. 400, 404, 410).
+
+    Args:
+        status_code (int): The HTTP status code of the response.
+
+    Returns:
+        bool: True if the delivery should not be retried.
+    """
+    return 400 <= status_code < 500 and status_code not in RETRYABLE_CLIENT_ERRORS
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a `Retry-After` header given either in seconds or as an HTTP date.
+
+    Args:
+        value (Optional[str]): The header value.
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def next_retry_delay(
+    policy: Optional[dict],
+    attempt_number: int,
+    elapsed: float,
+    retry_after: Optional[float] = None,
+) -> Optional[float]:
+    """
+    Compute how long to wait before the next attempt.
+
+    Without a policy the static `RETRY_INTERVALS` schedule is used. With a policy
+    the delay grows exponentially from `base_delay` up to `max_delay`, with jitter.
+    A `Retry-After` from the receiver is honoured as a minimum delay, capped at
+    `max_delay` (the longest `RETRY_INTERVALS` step without a policy).
+
+    Args:
+        policy (Optional[dict]): The subscription's retry policy.
+        attempt_number (int): Number of the attempt that just failed, starting at 1.
+        elapsed (float): Seconds since the first attempt.
+        retry_after (Optional[float], optional): Delay requested by the receiver.
+
+    Returns:
+        Optional[float]: Delay in seconds, or None when no retry is left.
+    """
+    if policy is None:
+        if attempt_number > len(RETRY_INTERVALS):
+            return None
+        delay = float(RETRY_INTERVALS[attempt_number - 1])
+        max_delay = float(max(RETRY_INTERVALS))
+        max_age = None
+    else:
+        if attempt_number >= policy["max_attempts"]:
+            return None
+        max_delay = policy["max_delay"]
+        delay = min(max_delay, policy["base_delay"] * 2 ** (attempt_number - 1))
+        if policy.get("jitter", True):
+            delay = delay / 2 + random.uniform(0, delay / 2)
+        max_age = policy.get("max_age")
+
+    if retry_after is not None:
+        delay = min(max(delay, retry_after), max_delay)
+
+    if max_age is not None and elapsed + delay > max_age:
+        return None
+
+    return delay
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+from uuid import uuid4
+from typing import List
+from datetime import datetime, timedelta, timezone
+
+from ..config import SCHEDULER_BATCH_SIZE, SCHEDULER_POLL_INTERVAL
+from ..database import db
+from ..delivery_logs.models import mark_deliveries_pending, record_final_status
+from ..delivery_logs.payloads import load_payloads
+from .queue import PriorityDeliveryQueue
+
+logger = logging.getLogger(__name__)
+collection = db.scheduled_deliveries
+
+CLAIM_LEASE = timedelta(minutes=10)  # claims older than this are picked up again
+
+
+async def ensure_scheduler_indexes():
+    """
+    Create the due-time index the poller uses to find due deliveries without scanning.
+    """
+    await collection.create_index([("due_at", 1)])
+
+
+async def schedule_delivery(item: dict, due_at: datetime):
+    """
+    Store a delivery to be enqueued once `due_at` has passed.
+
+    Only the `payload_ref` is stored; the payload is loaded from the payload
+    store when the delivery is enqueued.
+
+    Args:
+        item (dict): The queue item, including its `delivery_id` and `payload_ref`.
+        due_at (datetime): When the delivery becomes due.
+    """
+    item = {key: value for key, value in item.items() if key != "payload"}
+    await collection.insert_one(
+        {"_id": item["delivery_id"], "due_at": due_at, "item": item, "claimed_by": None}
+    )
+    logger.info(f"Scheduled delivery {item['delivery_id']} for {due_at.isoformat()}.")
+
+
+async def claim_due_deliveries(limit: int = SCHEDULER_BATCH_SIZE) -> List[dict]:
+    """
+    Claim up to `limit` due deliveries for this process.
+
+    The oldest due deliveries are read through the `due_at` index and claimed with a
+    conditional update, so a delivery is only claimed by one instance. A claim left
+    behind by a crash expires after `CLAIM_LEASE`.
+
+    Args:
+        limit (int, optional): Maximum number of deliveries to claim. Defaults to `SCHEDULER_BATCH_SIZE`.
+
+    Returns:
+        List[dict]: The claimed scheduled delivery documents.
+    """
+    now = datetime.now(timezone.utc)
+    claimable = {
+        "due_at": {"$lte": now},
+        "$or": [{"claimed_by": None}, {"claimed_at": {"$lt": now - CLAIM_LEASE}}],
+    }
+    candidates = (
+        await collection.find(claimable, {"_id": 1})
+        .sort("due_at", 1)
+        .limit(limit)
+        .to_list(length=limit)
+    )
+    if not candidates:
+        return []
+
+    owner = str(uuid4())
+    ids = [doc["_id"] for doc in candidates]
+    await collection.update_many(
+        {"_id": {"$in": ids}, **claimable},
+        {"$set": {"claimed_by": owner, "claimed_at": now}},
+    )
+    return await collection.find({"_id": {"$in": ids}, "claimed_by": owner}).to_list(
+        length=limit
+    )
+
+
+async def enqueue_due_deliveries_periodically(
+    queue: PriorityDeliveryQueue, stop_event: asyncio.Event
+):
+    """
+    Move due deliveries into the delivery queue in batches until stopped.
+
+    Polls every `SCHEDULER_POLL_INTERVAL` seconds, or immediately again while
+    full batches keep coming back.
+
+    Args:
+        queue (PriorityDeliveryQueue): The delivery queue.
+        stop_event (asyncio.Event): Event signalling shutdown.
+    """
+    while not stop_event.is_set():
+        claimed = []
+        try:
+            claimed = await claim_due_deliveries()
+            await _enqueue_claimed(queue, claimed)
+        except Exception as e:
+            logger.error(f"Error enqueuing scheduled deliveries: {e}")
+
+        if len(claimed) >= SCHEDULER_BATCH_SIZE:
+            continue  # More deliveries are due, keep going
+
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=SCHEDULER_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            continue
+
+
+async def _enqueue_claimed(queue: PriorityDeliveryQueue, claimed: List[dict]):
+    enqueued = []
+    lost = []
+    try:
+        payloads = await load_payloads(doc["item"]["payload_ref"] for doc in claimed)
+        for doc in claimed:
+            item = doc["item"]
+            if item["payload_ref"] not in payloads:
+                logger.error(f"Payload of scheduled delivery {doc['_id']} is missing.")
+                lost.append(doc["_id"])
+                continue
+            await queue.put({**item, "payload": payloads[item["payload_ref"]]})
+            enqueued.append(doc["_id"])
+    finally:
+        # Also runs when cancelled by a drain, which checkpoints what was enqueued
+        if enqueued or lost:
+            await collection.delete_many({"_id": {"$in": enqueued + lost}})
+        for delivery_id in lost:
+            record_final_status(delivery_id, "failed")
+        if enqueued:
+            await mark_deliveries_pending(enqueued)
+            logger.info(f"Enqueued {len(enqueued)} scheduled deliveries.")
+        await _release_claims(claimed, set(enqueued) | set(lost))
+
+
+async def _release_claims(claimed: List[dict], handled: set):
+    # Claims not acted on, e.g. when a drain cancels the poller, are freed at once
+    # instead of keeping the deliveries locked for CLAIM_LEASE after a restart
+    unhandled = [doc for doc in claimed if doc["_id"] not in handled]
+    if not unhandled:
+        return
+    await collection.update_many(
+        {
+            "_id": {"$in": [doc["_id"] for doc in unhandled]},
+            "claimed_by": unhandled[0]["claimed_by"],
+        },
+        {"$set": {"claimed_by": None}},
+    )
+    logger.info(f"Released {len(unhandled)} claimed scheduled deliveries.")
@@ -1,10 +1,20 @@
 import asyncio
 import logging
+from typing import List, Optional
 from datetime import datetime, timedelta, timezone
 
-from ..config import WORKER_COUNT
+from ..config import HIGH_PRIORITY_WORKERS, SHUTDOWN_DRAIN_TIMEOUT, WORKER_COUNT
+from .checkpoint import drain_event, restore_checkpoints, save_checkpoints
+from .queue import PriorityDeliveryQueue, priority_of
+from .scheduler import enqueue_due_deliveries_periodically
 from .tasks import send_webhook_task
 from ..database import db
+from ..delivery_logs.models import (
+    flush_log_updates_periodically,
+    flush_pending_updates,
+)
+from ..delivery_logs.payloads import delete_unreferenced_payloads
+from ..stats.service import flush_pending_stats, flush_stats_periodically
 
 logger = logging.getLogger(__name__)
 
@@ -13,48 +23,105 @@ stop_event = asyncio.Event()
 
 # Keep track of background tasks for graceful shutdown if needed
 background_tasks = []
+worker_tasks = []
+intake_tasks = []  # tasks feeding the queue, stopped before it is checkpointed
 
 
-def start_workers(queue: asyncio.Queue):
+def start_workers(queue: PriorityDeliveryQueue):
     for i in range(WORKER_COUNT):
         task = asyncio.create_task(worker_task(f"Worker-{i+1}", queue))
+        worker_tasks.append(task)
         background_tasks.append(task)
 
     logger.info(f"Started {WORKER_COUNT} webhook workers")
 
+    # Workers that only take high-priority events, so urgent deliveries still have
+    # free workers while every other worker is busy with slow bulk traffic
+    for i in range(HIGH_PRIORITY_WORKERS):
+        task = asyncio.create_task(
+            worker_task(f"HighPriorityWorker-{i+1}", queue, lanes=["high"])
+        )
+        worker_tasks.append(task)
+        background_tasks.append(task)
+
+    if HIGH_PRIORITY_WORKERS:
+        logger.info(f"Started {HIGH_PRIORITY_WORKERS} high-priority webhook workers")
+
+    # Re-enqueue deliveries checkpointed by a previous shutdown
+    intake_tasks.append(asyncio.create_task(restore_checkpoints(queue)))
+
+    # Start scheduled delivery poller
+    intake_tasks.append(
+        asyncio.create_task(enqueue_due_deliveries_periodically(queue, stop_event))
+    )
+    logger.info("Started scheduled delivery poller")
+
     # Start log cleanup task
     cleanup_task = asyncio.create_task(delete_old_logs_periodically())
     background_tasks.append(cleanup_task)
     logger.info("Started periodic log cleanup task")
 
+    # Start delivery log flush task
+    flush_task = asyncio.create_task(flush_log_updates_periodically(stop_event))
+    background_tasks.append(flush_task)
+    logger.info("Started periodic delivery log flush task")
 
-def stop_workers(queue: asyncio.Queue):
+    # Start delivery stats flush task
+    stats_task = asyncio.create_task(flush_stats_periodically(stop_event))
+    background_tasks.append(stats_task)
+    logger.info("Started periodic delivery stats flush task")
+
+
+def stop_workers(queue: PriorityDeliveryQueue):
     logger.info("Stopping workers...")
     stop_event.set()  # Trigger shutdown signal for periodic tasks
 
     # Add None to the queue to stop workers
-    for _ in range(WORKER_COUNT):
+    for _ in range(len(worker_tasks)):
         queue.put_nowait(None)
 
 
-async def worker_task(name: str, queue: asyncio.Queue):
+async def worker_task(
+    name: str, queue: PriorityDeliveryQueue, lanes: Optional[List[str]] = None
+):
     while True:
-        data = await queue.get()
+        data = await queue.get(lanes)
 
         if data is None:
             logger.info(f"{name} received shutdown signal. Exiting.")
             queue.task_done()
             return
 
-        logger.info(
-            f"Received task from queue by {name} | sub_id: {data['sub_id']} | queue size: {queue.qsize()}"
+        if drain_event.is_set():
+            # Picked up while draining: keep it for the next start instead of starting it
+            try:
+                await save_checkpoints([data])
+            except Exception as e:
+                logger.error(f"Error checkpointing delivery {data['delivery_id']}: {e}")
+            queue.task_done()
+            continue
+
+        logger.debug(
+            "Received task from queue by %s | priority: %s",
+            name,
+            priority_of(data),
+            extra={
+                "event": "worker.received",
+                "delivery_id": data["delivery_id"],
+                "subscription_id": data["sub_id"],
+            },
         )
 
         try:
             await send_webhook_task(
+                data["delivery_id"],
                 data["sub_id"],
                 data["payload"],
                 data["event_types"],
+                attempt_number=data.get("attempt_number", 1),
+                first_attempt_at=data.get("first_attempt_at"),
+                not_before=data.get("not_before"),
+                priority=data.get("priority"),
             )
         except Exception as e:
             logger.exception(f"Unexpected error during task execution: {e}")
@@ -62,16 +129,74 @@ async def worker_task(name: str, queue: asyncio.Queue):
         queue.task_done()
 
 
+def _take_queued(queue: PriorityDeliveryQueue) -> list:
+    items = []
+    while True:
+        try:
+            item = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return items
+        queue.task_done()
+        if item is not None:
+            items.append(item)
+
+
+async def drain_workers(queue: PriorityDeliveryQueue, timeout: float = SHUTDOWN_DRAIN_TIMEOUT):
+    """
+    Stop intake and shut the workers down within a deadline without losing events.
+
+    Queued events and events waiting for a retry are checkpointed to MongoDB and
+    restored on the next start. In-flight HTTP attempts are given until the deadline
+    to finish; attempts still running then are cancelled and redone after restart.
+
+    Args:
+        queue (PriorityDeliveryQueue): The delivery queue.
+        timeout (float, optional): Seconds to wait for in-flight attempts. Defaults to `SHUTDOWN_DRAIN_TIMEOUT`.
+    """
+    logger.info(f"Draining workers (deadline {timeout}s)...")
+    drain_event.set()  # Stop intake and wake up workers sleeping between retries
+
+    for task in intake_tasks:
+        task.cancel()
+    await asyncio.gather(*intake_tasks, return_exceptions=True)
+
+    try:
+        await save_checkpoints(_take_queued(queue))
+    except Exception as e:
+        logger.error(f"Error checkpointing queued deliveries: {e}")
+
+    stop_workers(queue)
+
+    _, pending = await asyncio.wait(worker_tasks, timeout=timeout)
+    if pending:
+        logger.warning(f"Cancelling {len(pending)} workers still running at the drain deadline")
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    # Events enqueued by requests that were already past the intake check
+    try:
+        await save_checkpoints(_take_queued(queue))
+    except Exception as e:
+        logger.error(f"Error checkpointing queued deliveries: {e}")
+
+
 async def delete_old_logs_periodically():
     while not stop_event.is_set():
         try:
             threshold_time = datetime.now(timezone.utc) - timedelta(hours=72)
+            # Scheduled deliveries are kept until 72 hours after they are due
             result = await db.delivery_logs.delete_many(
-                {"created_at": {"$lt": threshold_time}}
+                {
+                    "created_at": {"$lt": threshold_time},
+                    "deliver_at": {"$not": {"$gte": threshold_time}},
+                }
             )
             logger.info(
                 f"Deleted {result.deleted_count} delivery logs older than 72 hours"
             )
+            deleted_payloads = await delete_unreferenced_payloads(threshold_time)
+            logger.info(f"Deleted {deleted_payloads} unreferenced payloads")
         except Exception as e:
             logger.error(f"Error deleting old logs: {e}")
 
@@ -84,4 +209,7 @@ async def delete_old_logs_periodically():
 async def wait_for_background_tasks():
     """Waits for all background tasks to complete (for graceful shutdown)."""
     await asyncio.gather(*background_tasks, return_exceptions=True)
+    # Workers may record attempts after the flush task has exited
+    await flush_pending_updates()
+    await flush_pending_stats()
     logger.info("All background tasks completed.")
@@ -1,107 +1,308 @@
-import json
 import hmac
 import logging
 import asyncio
 import hashlib
-from uuid import uuid4
-from typing import List
+import itertools
+import time
+from typing import List, Optional
+from urllib.parse import urlparse
 from datetime import datetime, timezone
 
 from httpx import AsyncClient, HTTPStatusError, TimeoutException, ConnectError
 
-from ..constants import RETRY_INTERVALS
-from ..config import REQUEST_TIMEOUT
+from ..compression import compress, is_supported
+from ..constants import OUTBOUND_COMPRESSION_MIN_SIZE
+from ..serialization import dumps
+from ..delivery_logs.models import record_attempt, record_final_status
+from ..stats.service import record_attempt_stats, record_delivery_stats
 from ..subscriptions.models import get_subscription
-from ..database import db
+from .checkpoint import drain_event, save_checkpoints
+from .dns import BLOCKED_TARGET, DNS_FAILURE, delivery_transport
+from .latency import latency_tracker
+from .retry import is_permanent_failure, next_retry_delay, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
 
-async def send_webhook_task(sub_id: str, payload: dict, event: List[str]):
+def _log_attempt(delivery_id: str, sub_id: str, attempt: dict, started: float):
+    """Record an attempt in the delivery log and the subscription stats."""
+    record_attempt(delivery_id, attempt)
+    latency_ms = (time.perf_counter() - started) * 1000
+    record_attempt_stats(sub_id, attempt["success"], latency_ms)
+
+
+def compress_body(subscription: dict, body: bytes, headers: dict) -> bytes:
+    """
+    Compress an outbound body when the subscription opted in and it is large enough.
+
+    Args:
+        subscription (dict): The subscription being delivered to.
+        body (bytes): The serialized JSON body.
+        headers (dict): Request headers, updated with `Content-Encoding` when compressed.
+
+    Returns:
+        bytes: The body to send.
+    """
+    encoding = subscription.get("compression")
+    if not encoding:
+        return body
+
+    min_size = subscription.get("compression_min_size")
+    if min_size is None:
+        min_size = OUTBOUND_COMPRESSION_MIN_SIZE
+    if len(body) < min_size:
+        return body
+
+    if not is_supported(encoding):
+        logger.warning(f"Compression '{encoding}' is not available, sending uncompressed body")
+        return body
+
+    headers["Content-Encoding"] = encoding
+    return compress(body, encoding)
+
+
+def _finish(progress: dict, final_status: str):
+    """Record the outcome in the delivery log and the subscription stats."""
+    progress["finished"] = True  # nothing left to checkpoint
+    record_final_status(progress["delivery_id"], final_status)
+    record_delivery_stats(progress["sub_id"], final_status)
+
+
+async def wait_for_retry(delay: float) -> bool:
+    """
+    Sleep before the next attempt, waking up early if the service starts draining.
+
+    Args:
+        delay (float): Seconds to wait.
+
+    Returns:
+        bool: True if the full delay elapsed, False if draining started.
+    """
+    try:
+        await asyncio.wait_for(drain_event.wait(), timeout=delay)
+    except asyncio.TimeoutError:
+        return True
+    return False
+
+
+async def send_webhook_task(
+    delivery_id: str,
+    sub_id: str,
+    payload: dict,
+    event: List[str],
+    attempt_number: int = 1,
+    first_attempt_at: Optional[float] = None,
+    not_before: Optional[float] = None,
+    priority: Optional[str] = None,
+):
+    # Where to resume if the delivery is interrupted by a shutdown
+    progress = {
+        "delivery_id": delivery_id,
+        "sub_id": sub_id,
+        "payload": payload,
+        "event_types": event,
+        "attempt_number": attempt_number,
+        "first_attempt_at": first_attempt_at or time.time(),
+        "not_before": not_before,
+        "priority": priority,
+    }
+
+    try:
+        if not_before and not_before > time.time():
+            if not await wait_for_retry(not_before - time.time()):
+                await save_checkpoints([progress])
+                return
+        await _deliver(progress)
+    except asyncio.CancelledError:
+        # Shutdown deadline hit mid-attempt; the interrupted attempt is redone after restart
+        if not progress.get("finished"):
+            try:
+                await save_checkpoints([progress])
+            except Exception as e:
+                logger.error(f"Error checkpointing delivery {progress['delivery_id']}: {e}")
+        raise
+
+
+async def _deliver(progress: dict):
+    delivery_id = progress["delivery_id"]
+    sub_id = progress["sub_id"]
+    event = progress["event_types"]
+
+    # Attached to every log record of this delivery
+    context = {"delivery_id": delivery_id, "subscription_id": sub_id}
+
     subscription = await get_subscription(sub_id, event_type=event)
 
     if not subscription:
-        logger.warning(f"No subscription found for ID: {sub_id} and event: {event}")
+        logger.warning(
+            "No subscription found for ID: %s and event: %s",
+            sub_id,
+            event,
+            extra={"event": "delivery.unknown_subscription", **context},
+        )
+        _finish(progress, "failed")
         return
 
-    logger.info(f"Sending webhook to {subscription['target_url']} for event(s): {event}")
+    logger.debug(
+        "Sending webhook to %s for event(s): %s",
+        subscription["target_url"],
+        event,
+        extra={"event": "delivery.started", **context},
+    )
 
     headers = {
         "Content-Type": "application/json",
         "X-Webhook-Event": ", ".join(event),
     }
 
-    log_id = str(uuid4())
-    log_entry = {
-        "_id": log_id,
-        "subscription_id": subscription["_id"],
-        "target_url": subscription["target_url"],
-        "event_types": subscription.get("event_types", []),
-        "payload": payload,
-        "attempts": [],
-        "final_status": None,
-        "created_at": datetime.now(timezone.utc),
-    }
+    # Serialize once; the signature covers these bytes before any compression
+    body = dumps(progress["payload"])
 
     # Add signature if secret is set
     if secret := subscription.get("secret"):
-        body = json.dumps(payload).encode()
         signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
         headers["X-Hub-Signature-256"] = f"sha256={signature}"
 
-    async with AsyncClient() as client:
-        for i, delay in enumerate(RETRY_INTERVALS + [0]):  # Final zero for delay before last retry
+    # Compress once so retries reuse the same bytes
+    body = compress_body(subscription, body, headers)
+
+    target_url = subscription["target_url"]
+    host = urlparse(target_url).hostname or target_url
+    retry_policy = subscription.get("retry_policy")
+
+    async with AsyncClient(transport=delivery_transport()) as client:
+        for attempt_number in itertools.count(progress["attempt_number"]):
+            progress["attempt_number"] = attempt_number
+            progress["not_before"] = None
             attempt = {
                 "timestamp": datetime.now(timezone.utc),
-                "attempt": i + 1,
+                "attempt": attempt_number,
                 "status_code": None,
                 "success": False,
                 "error": None,
             }
+            retry_after = None
+            timeout = latency_tracker.timeout_for(host)
+            started = time.perf_counter()
 
             try:
                 response = await client.post(
-                    subscription["target_url"],
-                    json=payload,
+                    target_url,
+                    content=body,
                     headers=headers,
-                    timeout=REQUEST_TIMEOUT,
+                    timeout=timeout,
                 )
+                latency_tracker.record(host, time.perf_counter() - started)
                 response.raise_for_status()
                 attempt["status_code"] = response.status_code
                 attempt["success"] = True
-                log_entry["attempts"].append(attempt)
-                log_entry["final_status"] = "success"
-                logger.info(f"Webhook sent successfully to {subscription['target_url']} (attempt {i + 1})")
+                _log_attempt(delivery_id, sub_id, attempt, started)
+                _finish(progress, "success")
+                logger.info(
+                    "Webhook sent successfully to %s (attempt %d)",
+                    target_url,
+                    attempt_number,
+                    extra={"event": "delivery.sent", **context},
+                )
                 break  # Success, exit retry loop
 
             except TimeoutException:
+                # Count the timeout itself so the adaptive timeout can grow back
+                latency_tracker.record(host, timeout)
                 attempt["error"] = "Timeout"
-                logger.warning(f"Webhook attempt {i + 1} timed out.")
+                logger.warning(
+                    "Webhook attempt %d timed out after %.2fs.",
+                    attempt_number,
+                    timeout,
+                    extra={"event": "delivery.timeout", **context},
+                )
 
             except ConnectError as exc:
                 attempt["error"] = "Connection error"
-                logger.warning(f"Webhook attempt {i + 1} connection error: {exc}")
+                logger.warning(
+                    "Webhook attempt %d connection error: %s",
+                    attempt_number,
+                    exc,
+                    extra={"event": "delivery.connect_error", **context},
+                )
+                if str(exc).startswith(DNS_FAILURE):
+                    # Failures are cached briefly, so retries within that window fail at once
+                    attempt["error"] = "DNS resolution failed"
+                if str(exc).startswith(BLOCKED_TARGET):
+                    attempt["error"] = "Target resolves to a blocked address"
+                    logger.error(
+                        "%s resolves to a blocked address. Aborting retries.",
+                        target_url,
+                        extra={"event": "delivery.blocked_target", **context},
+                    )
+                    _log_attempt(delivery_id, sub_id, attempt, started)
+                    _finish(progress, "failed")
+                    break
                 if "CERTIFICATE_VERIFY_FAILED" in str(exc):
                     attempt["error"] = "SSL certificate verification failed"
-                    logger.error("SSL certificate verification failed. Aborting retries.")
-                    log_entry["attempts"].append(attempt)
+                    logger.error(
+                        "SSL certificate verification failed. Aborting retries.",
+                        extra={"event": "delivery.certificate_error", **context},
+                    )
+                    _log_attempt(delivery_id, sub_id, attempt, started)
+                    _finish(progress, "failed")
                     break
 
             except HTTPStatusError as exc:
-                attempt["status_code"] = exc.response.status_code
+                status_code = exc.response.status_code
+                attempt["status_code"] = status_code
                 attempt["error"] = str(exc)
-                logger.warning(f"Webhook attempt {i + 1} received HTTP error: {exc.response.status_code}")
+                logger.warning(
+                    "Webhook attempt %d received HTTP error: %d",
+                    attempt_number,
+                    status_code,
+                    extra={"event": "delivery.http_error", **context},
+                )
+                if is_permanent_failure(status_code):
+                    logger.error(
+                        "Receiver rejected webhook with %d. Aborting retries.",
+                        status_code,
+                        extra={"event": "delivery.rejected", **context},
+                    )
+                    _log_attempt(delivery_id, sub_id, attempt, started)
+                    _finish(progress, "failed")
+                    break
+                retry_after = parse_retry_after(exc.response.headers.get("Retry-After"))
 
             except Exception as exc:
                 attempt["error"] = str(exc)
-                logger.exception(f"Unexpected error during webhook attempt {i + 1}: {exc}")
+                logger.exception(
+                    "Unexpected error during webhook attempt %d: %s",
+                    attempt_number,
+                    exc,
+                    extra={"event": "delivery.unexpected_error", **context},
+                )
 
-            log_entry["attempts"].append(attempt)
-            await asyncio.sleep(delay)
+            _log_attempt(delivery_id, sub_id, attempt, started)
 
-        else:
-            log_entry["final_status"] = "failed"
-            logger.error(f"All webhook attempts failed for subscription {sub_id}")
+            delay = next_retry_delay(
+                retry_policy,
+                attempt_number,
+                time.time() - progress["first_attempt_at"],
+                retry_after,
+            )
+            if delay is None:
+                _finish(progress, "failed")
+                logger.error(
+                    "All webhook attempts failed for subscription %s",
+                    sub_id,
+                    extra={"event": "delivery.failed", **context},
+                )
+                break
 
-    result = await db.delivery_logs.insert_one(log_entry)
-    logger.info(f"Delivery log saved with ID: {log_id}")
+            progress["attempt_number"] = attempt_number + 1
+            progress["not_before"] = time.time() + delay
+            if not await wait_for_retry(delay):
+                logger.info(
+                    "Draining: checkpointing delivery %s before attempt %d",
+                    delivery_id,
+                    attempt_number + 1,
+                    extra={"event": "delivery.checkpointed", **context},
+                )
+                await save_checkpoints([progress])
+                return
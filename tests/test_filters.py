@@ -0,0 +1,70 @@
+import pytest
+
+from app.subscriptions.filters import compile_condition, compile_filter
+
+
+def matches(op, value, payload, path="a"):
+    return compile_condition({"path": path, "op": op, "value": value})(payload)
+
+
+@pytest.mark.parametrize("expected, actual, equal", [
+    (1, 1, True),
+    (1, 1.0, True),
+    ("x", "x", True),
+    (None, None, True),
+    (True, True, True),
+    (1, True, False),
+    (0, False, False),
+    (True, 1, False),
+    (False, 0, False),
+    (1.0, True, False),
+    ([1, 0], [True, False], False),
+    ({"b": 1}, {"b": True}, False),
+    ({"b": [1]}, {"b": [1]}, True),
+])
+def test_eq_and_ne_never_equate_booleans_and_numbers(expected, actual, equal):
+    assert matches("eq", expected, {"a": actual}) is equal
+    assert matches("ne", expected, {"a": actual}) is not equal
+
+@pytest.mark.parametrize("options, actual, member", [
+    ([0, 1], 1, True),
+    ([0], False, False),
+    ([1], True, False),
+    ([True], 1, False),
+    ([True, "x"], True, True),
+    ([False], False, True),
+    ([{"b": 1}], {"b": True}, False),
+    ([{"b": 1}, 0], False, False),
+    ([{"b": True}], {"b": True}, True),
+    (["x"], ["x"], False),
+])
+def test_in_and_nin_never_equate_booleans_and_numbers(options, actual, member):
+    assert matches("in", options, {"a": actual}) is member
+    assert matches("nin", options, {"a": actual}) is not member
+
+def test_missing_paths():
+    assert not matches("eq", None, {})
+    assert matches("ne", 1, {})
+    assert not matches("in", [None], {})
+    assert matches("nin", [None], {})
+    assert matches("exists", False, {"b": 1})
+    assert not matches("exists", True, {"b": 1})
+
+def test_nested_paths_and_list_indexes():
+    payload = {"order": {"items": [{"sku": "A-1", "qty": 2}]}}
+    assert matches("eq", "A-1", payload, path="order.items.0.sku")
+    assert not matches("exists", True, payload, path="order.items.1.sku")
+
+def test_comparisons_ignore_booleans():
+    assert matches("gt", 0, {"a": 1})
+    assert not matches("gt", 0, {"a": True})
+    assert not matches("lte", 1, {"a": "1"})
+
+def test_compile_filter_requires_every_condition():
+    predicate = compile_filter([
+        {"path": "type", "op": "eq", "value": "order.paid"},
+        {"path": "total", "op": "gte", "value": 100},
+    ])
+    assert predicate({"type": "order.paid", "total": 150})
+    assert not predicate({"type": "order.paid", "total": 50})
+    assert not predicate({"type": "order.created", "total": 150})
@@ -0,0 +1,188 @@
+import asyncio
+
+import pytest
+
+from app.workers.queue import PriorityDeliveryQueue, parse_priority_weights, priority_of
+
+WEIGHTS = {"high": 2, "normal": 1, "low": 1}
+
+
+def item(priority, n=0):
+    return {"delivery_id": f"{priority}-{n}", "priority": priority}
+
+def fill(queue, per_lane):
+    for n in range(per_lane):
+        for priority in ("low", "normal", "high"):
+            queue.put_nowait(item(priority, n))
+
+def drain(queue, count, lanes=None):
+    return [queue.get_nowait(lanes)["priority"] for _ in range(count)]
+
+
+def test_parse_priority_weights():
+    assert parse_priority_weights("high:8,normal:3") == {"high": 8, "normal": 3, "low": 1}
+    assert parse_priority_weights("high:0,urgent:5,low:x") == {"high": 1, "normal": 1, "low": 1}
+
+def test_priority_of_defaults_to_normal():
+    assert priority_of({"priority": "low"}) == "low"
+    assert priority_of({"priority": "urgent"}) == "normal"
+    assert priority_of({}) == "normal"
+    assert priority_of(None) == "normal"
+
+async def test_strict_mode_serves_most_urgent_lane_first():
+    queue = PriorityDeliveryQueue(mode="strict", weights=WEIGHTS)
+    fill(queue, 2)
+    assert drain(queue, 6) == ["high", "high", "normal", "normal", "low", "low"]
+
+async def test_weighted_mode_shares_workers_by_weight():
+    queue = PriorityDeliveryQueue(mode="weighted", weights=WEIGHTS)
+    fill(queue, 6)
+    order = drain(queue, 12)
+    assert order[:4] == ["high", "normal", "low", "high"]
+    for window in range(0, 12, 4):
+        assert sorted(order[window:window + 4]) == ["high", "high", "low", "normal"]
+
+async def test_lanes_are_fifo():
+    queue = PriorityDeliveryQueue(mode="strict", weights=WEIGHTS)
+    for n in range(3):
+        queue.put_nowait(item("normal", n))
+    assert [queue.get_nowait()["delivery_id"] for _ in range(3)] == ["normal-0", "normal-1", "normal-2"]
+
+async def test_unknown_mode_falls_back_to_weighted():
+    assert PriorityDeliveryQueue(mode="random").mode == "weighted"
+
+async def test_lane_restricted_get_ignores_other_lanes():
+    queue = PriorityDeliveryQueue(weights=WEIGHTS)
+    queue.put_nowait(item("low"))
+    with pytest.raises(asyncio.QueueEmpty):
+        queue.get_nowait(["high"])
+
+    getter = asyncio.create_task(queue.get(["high"]))
+    await asyncio.sleep(0)
+    queue.put_nowait(item("normal"))
+    await asyncio.sleep(0)
+    assert not getter.done()
+
+    queue.put_nowait(item("high"))
+    assert (await asyncio.wait_for(getter, 1))["priority"] == "high"
+    assert queue.qsize() == 2
+
+async def test_put_wakes_a_getter_for_its_lane():
+    queue = PriorityDeliveryQueue(weights=WEIGHTS)
+    high_getter = asyncio.create_task(queue.get(["high"]))
+    any_getter = asyncio.create_task(queue.get())
+    await asyncio.sleep(0)
+
+    queue.put_nowait(item("low"))
+    assert (await asyncio.wait_for(any_getter, 1))["priority"] == "low"
+    assert not high_getter.done()
+    high_getter.cancel()
+
+async def test_sentinels_wait_for_the_lanes_a_worker_reads():
+    queue = PriorityDeliveryQueue(weights=WEIGHTS)
+    queue.put_nowait(item("high"))
+    queue.put_nowait(item("low"))
+    queue.put_nowait(None)
+    queue.put_nowait(None)
+
+    # The high worker finishes its lane, then stops without touching the low lane
+    assert queue.get_nowait(["high"])["priority"] == "high"
+    assert queue.get_nowait(["high"]) is None
+    # The other worker only gets its sentinel once every lane is empty
+    assert queue.get_nowait()["priority"] == "low"
+    assert queue.get_nowait() is None
+    assert queue.empty()
+
+async def test_sentinel_wakes_a_lane_restricted_worker():
+    queue = PriorityDeliveryQueue(weights=WEIGHTS)
+    queue.put_nowait(item("normal"))
+    getter = asyncio.create_task(queue.get(["high"]))
+    await asyncio.sleep(0)
+    assert not getter.done()
+
+    queue.put_nowait(None)
+    assert await asyncio.wait_for(getter, 1) is None
+    assert queue.qsize() == 1
+
+async def test_put_nowait_raises_when_full_but_accepts_sentinels():
+    queue = PriorityDeliveryQueue(maxsize=2, weights=WEIGHTS)
+    queue.put_nowait(item("low"))
+    queue.put_nowait(item("high"))
+    assert queue.full()
+    with pytest.raises(asyncio.QueueFull):
+        queue.put_nowait(item("high"))
+    queue.put_nowait(None)
+    assert queue.qsize() == 2
+
+async def test_put_blocks_at_maxsize_until_an_item_is_taken():
+    queue = PriorityDeliveryQueue(maxsize=1, weights=WEIGHTS)
+    await queue.put(item("normal", 0))
+    putter = asyncio.create_task(queue.put(item("normal", 1)))
+    await asyncio.sleep(0)
+    assert not putter.done()
+
+    assert queue.get_nowait()["delivery_id"] == "normal-0"
+    await asyncio.wait_for(putter, 1)
+    assert queue.get_nowait()["delivery_id"] == "normal-1"
+
+async def test_cancelled_putter_passes_the_free_slot_on():
+    queue = PriorityDeliveryQueue(maxsize=1, weights=WEIGHTS)
+    queue.put_nowait(item("normal", 0))
+    first = asyncio.create_task(queue.put(item("normal", 1)))
+    second = asyncio.create_task(queue.put(item("normal", 2)))
+    await asyncio.sleep(0)
+
+    queue.get_nowait()  # wakes the first putter
+    first.cancel()
+    await asyncio.wait_for(second, 1)
+    assert queue.get_nowait()["delivery_id"] == "normal-2"
+    assert first.cancelled()
+
+async def test_cancelled_getter_is_removed():
+    queue = PriorityDeliveryQueue(weights=WEIGHTS)
+    getter = asyncio.create_task(queue.get())
+    await asyncio.sleep(0)
+    getter.cancel()
+    await asyncio.sleep(0)
+    assert getter.cancelled()
+
+    queue.put_nowait(item("normal"))
+    assert queue.get_nowait()["priority"] == "normal"
+
+async def test_getter_cancelled_after_wakeup_passes_the_item_on():
+    queue = PriorityDeliveryQueue(weights=WEIGHTS)
+    first = asyncio.create_task(queue.get())
+    second = asyncio.create_task(queue.get())
+    await asyncio.sleep(0)
+
+    queue.put_nowait(item("normal"))  # wakes the first getter
+    first.cancel()
+    assert (await asyncio.wait_for(second, 1))["priority"] == "normal"
+    assert first.cancelled()
+
+async def test_join_waits_for_task_done():
+    queue = PriorityDeliveryQueue(weights=WEIGHTS)
+    queue.put_nowait(item("normal"))
+    queue.get_nowait()
+    joiner = asyncio.create_task(queue.join())
+    await asyncio.sleep(0)
+    assert not joiner.done()
+
+    queue.task_done()
+    await asyncio.wait_for(joiner, 1)
+    with pytest.raises(ValueError):
+        queue.task_done()
+
+async def test_snapshot_counts_per_lane():
+    queue = PriorityDeliveryQueue(maxsize=10, mode="strict", weights=WEIGHTS)
+    fill(queue, 2)
+    queue.get_nowait()
+
+    snapshot = queue.snapshot()
+    assert snapshot["mode"] == "strict"
+    assert snapshot["size"] == 5
+    assert snapshot["lanes"]["high"]["depth"] == 1
+    assert snapshot["lanes"]["high"]["enqueued"] == 2
+    assert snapshot["lanes"]["high"]["dequeued"] == 1
+    assert snapshot["lanes"]["high"]["wait_p50_ms"] is not None
+    assert snapshot["lanes"]["low"]["wait_p50_ms"] is None
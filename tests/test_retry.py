@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from app.constants import RETRY_INTERVALS
+from app.workers.latency import HostLatencyTracker
+from app.workers.retry import is_permanent_failure, next_retry_delay, parse_retry_after
+
+POLICY = {"max_attempts": 5, "base_delay": 10, "max_delay": 60, "max_age": None, "jitter": False}
+
+
+@pytest.mark.parametrize("status_code, permanent", [
+    (400, True), (404, True), (410, True), (408, False), (425, False), (429, False), (500, False), (503, False),
+])
+def test_is_permanent_failure(status_code, permanent):
+    assert is_permanent_failure(status_code) is permanent
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+    assert 55 <= parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 60
+    past = datetime.now(timezone.utc) - timedelta(seconds=60)
+    assert parse_retry_after(format_datetime(past, usegmt=True)) == 0.0
+
+def test_default_schedule():
+    delays = [next_retry_delay(None, attempt, 0) for attempt in range(1, len(RETRY_INTERVALS) + 2)]
+    assert delays == [float(interval) for interval in RETRY_INTERVALS] + [None]
+
+def test_policy_backoff_is_exponential_and_capped():
+    delays = [next_retry_delay(POLICY, attempt, 0) for attempt in range(1, 6)]
+    assert delays == [10, 20, 40, 60, None]
+
+def test_policy_jitter_stays_within_half_to_full_delay():
+    policy = {**POLICY, "jitter": True}
+    for _ in range(100):
+        assert 20 <= next_retry_delay(policy, 3, 0) <= 40
+
+def test_policy_max_age():
+    policy = {**POLICY, "max_age": 100}
+    assert next_retry_delay(policy, 2, 70) == 20
+    assert next_retry_delay(policy, 2, 90) is None
+
+def test_retry_after_is_a_minimum():
+    assert next_retry_delay(POLICY, 1, 0, retry_after=30) == 30
+    assert next_retry_delay(POLICY, 1, 0, retry_after=5) == 10
+    assert next_retry_delay(None, 1, 0, retry_after=45) == 45
+
+def test_retry_after_is_capped_at_max_delay():
+    assert next_retry_delay(POLICY, 1, 0, retry_after=3600) == 60
+    assert next_retry_delay(None, 1, 0, retry_after=3600) == max(RETRY_INTERVALS)
+
+def test_retry_after_does_not_extend_max_attempts():
+    assert next_retry_delay(POLICY, 5, 0, retry_after=30) is None
+
+
+def make_tracker(**kwargs):
+    options = {"factor": 3, "min_timeout": 1, "max_timeout": 30, "min_samples": 5}
+    return HostLatencyTracker(**{**options, **kwargs})
+
+def test_timeout_for_unknown_host_is_the_global_timeout():
+    assert make_tracker().timeout_for("example.com") == 30
+
+def test_timeout_for_waits_for_min_samples():
+    tracker = make_tracker()
+    for _ in range(4):
+        tracker.record("example.com", 0.5)
+    assert tracker.timeout_for("example.com") == 30
+    tracker.record("example.com", 0.5)
+    assert tracker.timeout_for("example.com") == pytest.approx(1.5, rel=0.05)
+
+def test_timeout_for_is_clamped():
+    tracker = make_tracker()
+    for _ in range(10):
+        tracker.record("fast.example", 0.01)
+        tracker.record("slow.example", 20)
+    assert tracker.timeout_for("fast.example") == 1
+    assert tracker.timeout_for("slow.example") == 30
+
+def test_timeout_for_follows_the_tail():
+    tracker = make_tracker(min_samples=1)
+    for _ in range(99):
+        tracker.record("example.com", 0.1)
+    tracker.record("example.com", 4)
+    # p99 is still the typical latency; the EWMA (0.2 * 4 + 0.8 * 0.1) picks up the outlier
+    assert tracker.timeout_for("example.com") == pytest.approx(0.88 * 3, rel=0.05)
+
+def test_hosts_are_tracked_separately():
+    tracker = make_tracker(min_samples=1)
+    tracker.record("a.example", 2)
+    assert tracker.timeout_for("a.example") == pytest.approx(6, rel=0.05)
+    assert tracker.timeout_for("b.example") == 30
@@ -93,8 +93,233 @@ async def test_delete_nonexistent_subscription():
     async with aiohttp.ClientSession() as session:
         async with session.delete(f"{BASE_URL}/subscriptions/663d6b5c72a4f72a1fdf9999") as response:
             assert response.status == 404
+
+
+@pytest.mark.asyncio
+async def test_ingest_returns_visible_delivery_log():
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"{BASE_URL}/subscriptions", json={
+            "target_url": "https://test.com",
+            "event_types": ["test.event"]
+        }) as create_resp:
+            sub_id = (await create_resp.json())["_id"]
+
+        async with session.post(f"{BASE_URL}/ingest/{sub_id}", json={
+            "order_id": "1234"
+        }) as ingest_resp:
+            assert ingest_resp.status == 202
+            delivery_id = (await ingest_resp.json())["delivery_id"]
+
+        # The log exists immediately, before the delivery has finished
+        async with session.get(f"{BASE_URL}/status/delivery/{delivery_id}") as status_resp:
+            assert status_resp.status == 200
+            log = await status_resp.json()
+            assert log["subscription_id"] == sub_id
   
 
+
+@pytest.mark.asyncio
+async def test_delivery_logs_fields_and_summary():
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"{BASE_URL}/subscriptions", json={
+            "target_url": "https://test.com",
+            "event_types": ["test.event"]
+        }) as create_resp:
+            sub_id = (await create_resp.json())["_id"]
+
+        async with session.post(f"{BASE_URL}/ingest/{sub_id}", json={
+            "order_id": "1234"
+        }) as ingest_resp:
+            delivery_id = (await ingest_resp.json())["delivery_id"]
+
+        async with session.get(
+            f"{BASE_URL}/status/delivery/subscription/{sub_id}",
+            params={"fields": "delivery_id,final_status,payload"}
+        ) as fields_resp:
+            assert fields_resp.status == 200
+            rows = await fields_resp.json()
+            assert rows[0] == {
+                "delivery_id": delivery_id,
+                "final_status": rows[0]["final_status"],
+                "payload": {"order_id": "1234"},
+            }
+
+        async with session.get(
+            f"{BASE_URL}/status/delivery/subscription/{sub_id}", params={"summary": "true"}
+        ) as summary_resp:
+            assert summary_resp.status == 200
+            rows = await summary_resp.json()
+            assert set(rows[0]) == {"delivery_id", "subscription_id", "final_status", "created_at"}
+            assert rows[0]["subscription_id"] == sub_id
+
+        async with session.get(
+            f"{BASE_URL}/status/delivery-logs", params={"summary": "true", "limit": "5"}
+        ) as logs_summary_resp:
+            assert logs_summary_resp.status == 200
+            rows = await logs_summary_resp.json()
+            assert all(
+                set(row) == {"delivery_id", "subscription_id", "final_status", "created_at"}
+                for row in rows
+            )
+
+        async with session.get(
+            f"{BASE_URL}/status/delivery-logs", params={"fields": "delivery_id,secret"}
+        ) as unknown_resp:
+            assert unknown_resp.status == 422
+            assert "secret" in (await unknown_resp.json())["detail"]
+
+        async with session.get(
+            f"{BASE_URL}/status/delivery/subscription/{sub_id}", params={"fields": "nope"}
+        ) as unknown_recent_resp:
+            assert unknown_recent_resp.status == 422
+
+
+@pytest.mark.asyncio
+async def test_subscription_stats():
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{BASE_URL}/stats/subscription/unknown-sub?buckets=5") as response:
+            assert response.status == 200
+            data = await response.json()
+            assert len(data["buckets"]) == 5
+            assert data["totals"]["attempts"] == 0
+            assert data["totals"]["success_rate"] is None
+
+
+@pytest.mark.asyncio
+async def test_bulk_lifecycle_and_pagination():
+    async with aiohttp.ClientSession() as session:
+        # Bulk create
+        async with session.post(f"{BASE_URL}/subscriptions/bulk", json={
+            "subscriptions": [
+                {"target_url": "https://bulk.test.com", "event_types": ["bulk.event"]}
+                for _ in range(3)
+            ]
+        }) as create_resp:
+            assert create_resp.status == 201
+            ids = [sub["_id"] for sub in await create_resp.json()]
+            assert len(ids) == 3
+
+        # Paginate through the filtered listing
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2, "target_host": "bulk.test.com"}
+            if cursor:
+                params["cursor"] = cursor
+            async with session.get(f"{BASE_URL}/subscriptions", params=params) as list_resp:
+                assert list_resp.status == 200
+                seen += [sub["_id"] for sub in await list_resp.json()]
+                cursor = list_resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        assert set(ids) <= set(seen)
+
+        # Bulk update
+        async with session.put(f"{BASE_URL}/subscriptions/bulk", json={
+            "subscriptions": [
+                {"_id": ids[0], "event_types": ["bulk.updated"]},
+                {"_id": "663d6b5c72a4f72a1fdf9999", "event_types": ["bulk.updated"]},
+            ]
+        }) as update_resp:
+            assert update_resp.status == 200
+            result = await update_resp.json()
+            assert result["updated"][0]["event_types"] == ["bulk.updated"]
+            assert result["not_found"] == ["663d6b5c72a4f72a1fdf9999"]
+
+        # Bulk delete
+        async with session.post(f"{BASE_URL}/subscriptions/bulk/delete", json={"ids": ids}) as delete_resp:
+            assert delete_resp.status == 200
+            assert (await delete_resp.json())["deleted_count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_ingest_scheduled_delivery():
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"{BASE_URL}/subscriptions", json={
+            "target_url": "https://test.com",
+            "event_types": ["test.event"]
+        }) as create_resp:
+            sub_id = (await create_resp.json())["_id"]
+
+        async with session.post(f"{BASE_URL}/ingest/{sub_id}?delay=3600", json={
+            "reminder": "tomorrow"
+        }) as ingest_resp:
+            assert ingest_resp.status == 202
+            data = await ingest_resp.json()
+            assert data["detail"] == "Scheduled"
+            delivery_id = data["delivery_id"]
+
+        async with session.get(f"{BASE_URL}/status/delivery/{delivery_id}") as status_resp:
+            assert status_resp.status == 200
+            log = await status_resp.json()
+            assert log["final_status"] == "scheduled"
+            assert log["deliver_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_ingest_payload_filters():
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"{BASE_URL}/subscriptions", json={
+            "target_url": "https://test.com",
+            "event_types": ["order.update"],
+            "filters": [{"path": "order.total", "op": "gte", "value": 100}]
+        }) as create_resp:
+            assert create_resp.status == 201
+            sub_id = (await create_resp.json())["_id"]
+
+        async with session.post(f"{BASE_URL}/ingest/{sub_id}", json={
+            "order": {"total": 20}
+        }) as filtered_resp:
+            assert filtered_resp.status == 202
+            assert (await filtered_resp.json())["detail"] == "Filtered"
+
+        async with session.post(f"{BASE_URL}/ingest/{sub_id}", json={
+            "order": {"total": 250}
+        }) as accepted_resp:
+            assert accepted_resp.status == 202
+            assert "delivery_id" in await accepted_resp.json()
+
+        async with session.post(f"{BASE_URL}/subscriptions", json={
+            "target_url": "https://test.com",
+            "event_types": ["order.update"],
+            "filters": [{"path": "order.total", "op": "gte", "value": "high"}]
+        }) as invalid_resp:
+            assert invalid_resp.status == 422
+
+@pytest.mark.asyncio
+async def test_ingest_priority_and_queue_stats():
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"{BASE_URL}/subscriptions", json={
+            "target_url": "https://test.com",
+            "event_types": ["payment.failed"],
+            "priority": "high"
+        }) as create_resp:
+            assert create_resp.status == 201
+            sub_id = (await create_resp.json())["_id"]
+
+        async with session.get(f"{BASE_URL}/subscriptions/{sub_id}") as get_resp:
+            assert (await get_resp.json())["priority"] == "high"
+
+        async with session.post(f"{BASE_URL}/ingest/{sub_id}", json={"amount": 10}) as accepted_resp:
+            assert accepted_resp.status == 202
+
+        async with session.post(
+            f"{BASE_URL}/ingest/{sub_id}", json={"amount": 10}, headers={"X-Webhook-Priority": "low"}
+        ) as override_resp:
+            assert override_resp.status == 202
+
+        async with session.post(
+            f"{BASE_URL}/ingest/{sub_id}", json={"amount": 10}, headers={"X-Webhook-Priority": "urgent"}
+        ) as invalid_resp:
+            assert invalid_resp.status == 422
+
+        async with session.get(f"{BASE_URL}/stats/queue") as stats_resp:
+            assert stats_resp.status == 200
+            data = await stats_resp.json()
+            assert set(data["lanes"]) == {"high", "normal", "low"}
+            assert data["lanes"]["high"]["enqueued"] >= 1
+            assert data["lanes"]["low"]["enqueued"] >= 1
+
 # @pytest.mark.asyncio
 # async def test_webhook_triggered_with_respx():
 #     target_url = "https://webhook.site/test-endpoint"
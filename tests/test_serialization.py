@@ -0,0 +1,70 @@
+import json
+from uuid import UUID
+from datetime import datetime, timezone
+
+import pytest
+
+from app.serialization import JSONResponse, dumps, loads
+
+
+@pytest.mark.parametrize("value", [
+    0,
+    -1,
+    2**63 - 1,
+    -(2**63),
+    2**64 - 1,
+    2**64,
+    -(2**63) - 1,
+    -9999999999999999999,
+    123456789012345678901234,
+    -123456789012345678901234,
+])
+def test_integers_round_trip_exactly(value):
+    raw = f'{{"a":{value}}}'.encode()
+    body = loads(raw)
+    assert body == {"a": value}
+    assert isinstance(body["a"], int)
+    assert dumps(body) == raw
+
+def test_loads_accepts_str_with_long_integers():
+    assert loads('{"a":-9999999999999999999}') == {"a": -9999999999999999999}
+
+def test_long_digit_strings_are_kept():
+    body = {"id": "12345678901234567890123", "price": 0.1234567890123456789}
+    assert loads(dumps(body)) == body
+
+def test_round_trip_nested_document():
+    body = {
+        "order": {"id": 42, "items": [{"sku": "A-1", "qty": 2}], "paid": True},
+        "note": "café ☃",
+        "total": 19.99,
+        "coupon": None,
+    }
+    raw = dumps(body)
+    assert loads(raw) == body
+    assert json.loads(raw) == body
+
+def test_dumps_is_compact_utf8():
+    assert dumps({"a": [1, 2], "b": "é"}) == '{"a":[1,2],"b":"é"}'.encode()
+
+def test_dumps_serializes_datetimes_and_uuids():
+    value = {
+        "at": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        "id": UUID("12345678-1234-5678-1234-567812345678"),
+    }
+    body = loads(dumps(value))
+    assert body["at"].startswith("2024-01-02T03:04:05")
+    assert body["id"] == "12345678-1234-5678-1234-567812345678"
+
+def test_dumps_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        dumps({"a": object()})
+
+def test_loads_rejects_invalid_json():
+    with pytest.raises(ValueError):
+        loads(b"{not json")
+
+def test_json_response_renders_with_codec():
+    response = JSONResponse({"a": 2**70})
+    assert response.body == b'{"a":1180591620717411303424}'
+    assert response.media_type == "application/json"
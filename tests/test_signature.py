@@ -0,0 +1,24 @@
+import hmac
+import json
+import hashlib
+
+from app.webhooks.router import signature_matches
+
+SECRET = "hi"
+
+def sign(body: bytes) -> str:
+    return "sha256=" + hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+
+def test_signature_over_raw_body():
+    raw_body = '{ "name": "café" }'.encode()
+    assert signature_matches(SECRET, raw_body, json.loads(raw_body), sign(raw_body))
+
+def test_signature_over_stdlib_compact_reserialization():
+    payload = {"name": "café", "total": 1.10, "id": 2**70}
+    signed = json.dumps(payload, separators=(",", ":")).encode()
+    raw_body = json.dumps(payload).encode()  # what e.g. `requests` sends for `json=`
+    assert signature_matches(SECRET, raw_body, json.loads(raw_body), sign(signed))
+
+def test_signature_mismatch():
+    raw_body = b'{"order":"success"}'
+    assert not signature_matches(SECRET, raw_body, json.loads(raw_body), sign(b'{"order":"failed"}'))